@@ -13,30 +13,167 @@ Usage:
 """
 
 import argparse
+import copy
+import functools
+import hashlib
 import json
 import os
+import warnings
 import numpy as np
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, Tuple, Optional
+from dataclasses import dataclass
 
 from virtual_observatory.observatory_network import ObservatoryNetwork
-from virtual_observatory.spatial_interpolation import SpatialInterpolator
+from virtual_observatory.spatial_interpolation import SpatialInterpolator, InterpolationResult
 from virtual_observatory.virtual_station_predictor import VirtualObservatoryPredictor
 
+# Optional fast JSON serializer (falls back to the standard library)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional IGRF spherical-harmonic model for worldwide declination
+try:
+    import ppigrf
+    IGRF_AVAILABLE = True
+except ImportError:
+    IGRF_AVAILABLE = False
+
+
+@dataclass
+class ScaledResult:
+    """Interpolation result converted to display units."""
+    components: np.ndarray
+    magnitude: float
+    uncertainty: float
+
+    @classmethod
+    def from_tesla(cls, result: InterpolationResult, scale: float = 1e6) -> 'ScaledResult':
+        """Scale a Tesla InterpolationResult (default: to μT) with one vector multiply."""
+        values = np.array([result.x_component, result.y_component, result.z_component,
+                           result.magnitude, result.uncertainty_mag]) * scale
+        return cls(components=values[:3], magnitude=float(values[3]), uncertainty=float(values[4]))
+
+
+@functools.lru_cache(maxsize=1)
+def _build_config_template() -> Dict:
+    """
+    Location-independent part of a virtual observatory configuration.
+
+    Built once and shared; callers must deepcopy before modifying it.
+    """
+    return {
+        "version": "1.0",
+        "created": None,          # Per call
+        "description": None,      # Per location
+        "target_location": None,  # Per location
+
+        "interpolation": {
+            "method": "idw",
+            "update_interval_minutes": 5,
+            "max_data_age_hours": 2,
+            "uncertainty_threshold": 0.1,
+            "idw_power": 2.0,
+            "gp_kernel_length_scale": 100.0,
+            "ensemble_weights": {
+                "idw": 0.3,
+                "gp": 0.7
+            }
+        },
+
+        "validation": {
+            "local_sensor_available": False,
+            "validation_interval_hours": 1,
+            "alert_threshold_percent": 20,
+            "validation_window_minutes": 30,
+            "enable_alerts": True
+        },
+
+        "data_quality": {
+            "min_observatories": 3,
+            "max_missing_data_percent": 25,
+            "temporal_consistency_check": True,
+            "outlier_detection": True,
+            "outlier_threshold_sigma": 3.0
+        },
+
+        "observatory_network": {
+            "preferred_observatories": [],  # Will be auto-determined
+            "fallback_observatories": ["BOU", "FRD", "TUC", "NEW"],
+            "max_distance_km": 2000,
+            "weight_by_distance": True
+        },
+
+        "prediction_storage": {
+            "keep_history_hours": 24,
+            "auto_save_interval_hours": 6,
+            "save_format": "json",
+            "compress_old_data": True
+        },
+
+        "alerts": {
+            "large_field_change_threshold_nt": 1000,
+            "rapid_change_threshold_nt_per_minute": 50,
+            "validation_failure_threshold": 3,
+            "data_outage_threshold_minutes": 30
+        },
+
+        "performance": {
+            "enable_caching": True,
+            "cache_duration_minutes": 10,
+            "parallel_processing": False,
+            "max_memory_mb": 100
+        },
+
+        "logging": {
+            "level": "INFO",
+            "log_predictions": True,
+            "log_validations": True,
+            "log_file": None,  # Per location
+            "rotate_logs": True
+        }
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _build_network(lat_q: float, lon_q: float) -> ObservatoryNetwork:
+    """Build (and memoize) the observatory network for rounded coordinates."""
+    return ObservatoryNetwork(target_lat=lat_q, target_lon=lon_q)
+
+
+def _serialize_config(config: Dict) -> bytes:
+    """Serialize a configuration dictionary to indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(config, indent=2).encode('utf-8')
+
+
+def _config_digest(config: Dict) -> bytes:
+    """Content hash of a configuration, ignoring its creation timestamp."""
+    content = {key: value for key, value in config.items() if key != 'created'}
+    return hashlib.blake2b(_serialize_config(content), digest_size=16).digest()
+
 
 class VirtualObservatorySetup:
     """Setup and configuration tool for virtual observatories."""
 
+    # Normalizes location names to declination lookup keys
+    _KEY_TRANS = str.maketrans('', '', ' ,.')
+
     def __init__(self):
         """Initialize the setup tool."""
         self.config_dir = "config"
         self.ensure_config_directory()
 
-        # Common magnetic declination values (approximate)
-        self.declination_lookup = {
+        # Common magnetic declination values (approximate, degrees, positive
+        # east), used when the IGRF model cannot be evaluated
+        self.declination_lookup = MappingProxyType({
             # Alaska
-            "anchorage": -17.0, "fairbanks": -15.8, "juneau": -18.5, "nome": -14.2,
-            "barrow": -12.5, "palmer": -17.5,
+            "anchorage": 14.0, "fairbanks": 14.8, "juneau": 17.6, "nome": 7.1,
+            "barrow": 10.1, "palmer": 14.3,
             # Continental US
             "seattle": 16.2, "portland": 15.8, "san_francisco": 13.8, "los_angeles": 12.1,
             "denver": 8.5, "chicago": -3.2, "new_york": -13.6, "miami": -5.1,
@@ -44,38 +181,98 @@ class VirtualObservatorySetup:
             "reykjavik": -11.5, "tromso": 2.5, "stockholm": 5.2, "oslo": 1.8,
             "london": 0.2, "paris": 1.2, "berlin": 2.8, "moscow": 10.5,
             "tokyo": -7.1, "sydney": 12.5, "auckland": 20.2
-        }
+        })
+
+        # IGRF declinations already evaluated, keyed by location name and coordinates
+        self._declination_cache = {}
 
     def ensure_config_directory(self):
         """Ensure config directory exists."""
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)
 
-    def get_magnetic_declination(self, location_name: str, latitude: float) -> float:
+    def get_magnetic_declination(self, location_name: str, latitude: float,
+                                 longitude: Optional[float] = None,
+                                 elevation: float = 0) -> float:
         """
         Estimate magnetic declination for a location.
 
+        The IGRF model is evaluated when ppigrf is installed and a longitude is
+        given, and its result is cached under the location name. Otherwise the
+        lookup table is consulted (by full name, then by the part before the
+        first comma, e.g. "Palmer" for "Palmer, Alaska"), falling back to a
+        crude latitude-based approximation.
+
         Args:
             location_name: Name of the location
             latitude: Latitude in degrees
+            longitude: Longitude in degrees (enables the IGRF model)
+            elevation: Elevation in meters above sea level
+
+        Returns:
+            Estimated magnetic declination in degrees (positive east)
+        """
+        location_key = location_name.lower().translate(self._KEY_TRANS)
+
+        if IGRF_AVAILABLE and longitude is not None:
+            cache_key = (location_key, latitude, longitude, elevation)
+            declination = self._declination_cache.get(cache_key)
+            if declination is None:
+                declination = float(self.get_declinations([latitude], [longitude], elevation)[0])
+                self._declination_cache[cache_key] = declination
+            return declination
+
+        # Without the model, use the approximate table values
+        city_key = location_name.split(',')[0].lower().translate(self._KEY_TRANS)
+        for key in (location_key, city_key):
+            declination = self.declination_lookup.get(key)
+            if declination is not None:
+                return declination
+
+        return float(self.get_magnetic_declinations([latitude])[0])
+
+    def get_magnetic_declinations(self, latitudes) -> np.ndarray:
+        """
+        Rough latitude-based declination approximation (very crude), vectorized.
+
+        Args:
+            latitudes: Array-like of latitudes in degrees
 
         Returns:
-            Estimated magnetic declination in degrees
+            Array of estimated declinations in degrees (positive east)
+        """
+        lats = np.asarray(latitudes, dtype=np.float64)
+        return np.select(
+            [lats > 60, lats > 30, lats > 0],   # High (Alaska), mid, low northern latitudes
+            [15.0 - (lats - 60) * 0.5,
+             -5.0 + (lats - 30) * 0.3,
+             lats * 0.2],
+            default=10.0 + np.abs(lats) * 0.3   # Southern hemisphere
+        )
+
+    def get_declinations(self, latitudes, longitudes, elevation: float = 0) -> np.ndarray:
         """
-        # Check lookup table first
-        location_key = location_name.lower().replace(" ", "").replace(",", "")
-        if location_key in self.declination_lookup:
-            return self.declination_lookup[location_key]
-
-        # Rough approximation based on latitude (very crude)
-        if latitude > 60:  # High northern latitudes
-            return -15.0 + (latitude - 60) * 0.5
-        elif latitude > 30:  # Mid latitudes
-            return -5.0 + (latitude - 30) * 0.3
-        elif latitude > 0:  # Low northern latitudes
-            return 0.0 + latitude * 0.2
-        else:  # Southern hemisphere
-            return 10.0 + abs(latitude) * 0.3
+        Evaluate IGRF magnetic declination for many points at once.
+
+        Falls back to the latitude approximation when ppigrf is not installed.
+
+        Args:
+            latitudes: Array-like of latitudes in degrees
+            longitudes: Array-like of longitudes in degrees
+            elevation: Elevation in meters above sea level
+
+        Returns:
+            Array of declinations in degrees (positive east)
+        """
+        if not IGRF_AVAILABLE:
+            return self.get_magnetic_declinations(latitudes)
+
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        # Evaluate at the start of the current day so repeated runs agree
+        epoch = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        Be, Bn, _ = ppigrf.igrf(lons, lats, elevation / 1000.0, epoch)
+        return np.degrees(np.arctan2(Be, Bn)).reshape(lats.shape)
 
     def create_configuration(self, location_name: str, latitude: float,
                            longitude: float, elevation: float = 0) -> Dict:
@@ -91,87 +288,20 @@ class VirtualObservatorySetup:
         Returns:
             Configuration dictionary
         """
-        declination = self.get_magnetic_declination(location_name, latitude)
-
-        config = {
-            "version": "1.0",
-            "created": datetime.now().isoformat(),
-            "description": f"Virtual Geomagnetic Observatory Configuration for {location_name}",
-
-            "target_location": {
-                "latitude": latitude,
-                "longitude": longitude,
-                "elevation": elevation,
-                "name": location_name,
-                "magnetic_declination": declination,
-                "comments": f"Auto-generated configuration for {location_name}"
-            },
-
-            "interpolation": {
-                "method": "idw",
-                "update_interval_minutes": 5,
-                "max_data_age_hours": 2,
-                "uncertainty_threshold": 0.1,
-                "idw_power": 2.0,
-                "gp_kernel_length_scale": 100.0,
-                "ensemble_weights": {
-                    "idw": 0.3,
-                    "gp": 0.7
-                }
-            },
-
-            "validation": {
-                "local_sensor_available": False,
-                "validation_interval_hours": 1,
-                "alert_threshold_percent": 20,
-                "validation_window_minutes": 30,
-                "enable_alerts": True
-            },
-
-            "data_quality": {
-                "min_observatories": 3,
-                "max_missing_data_percent": 25,
-                "temporal_consistency_check": True,
-                "outlier_detection": True,
-                "outlier_threshold_sigma": 3.0
-            },
-
-            "observatory_network": {
-                "preferred_observatories": [],  # Will be auto-determined
-                "fallback_observatories": ["BOU", "FRD", "TUC", "NEW"],
-                "max_distance_km": 2000,
-                "weight_by_distance": True
-            },
-
-            "prediction_storage": {
-                "keep_history_hours": 24,
-                "auto_save_interval_hours": 6,
-                "save_format": "json",
-                "compress_old_data": True
-            },
-
-            "alerts": {
-                "large_field_change_threshold_nt": 1000,
-                "rapid_change_threshold_nt_per_minute": 50,
-                "validation_failure_threshold": 3,
-                "data_outage_threshold_minutes": 30
-            },
-
-            "performance": {
-                "enable_caching": True,
-                "cache_duration_minutes": 10,
-                "parallel_processing": False,
-                "max_memory_mb": 100
-            },
-
-            "logging": {
-                "level": "INFO",
-                "log_predictions": True,
-                "log_validations": True,
-                "log_file": f"virtual_observatory_{location_name.lower().replace(' ', '_').replace(',', '')}.log",
-                "rotate_logs": True
-            }
+        declination = self.get_magnetic_declination(location_name, latitude, longitude, elevation)
+
+        config = copy.deepcopy(_build_config_template())
+        config["created"] = datetime.now().isoformat()
+        config["description"] = f"Virtual Geomagnetic Observatory Configuration for {location_name}"
+        config["target_location"] = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "elevation": elevation,
+            "name": location_name,
+            "magnetic_declination": declination,
+            "comments": f"Auto-generated configuration for {location_name}"
         }
+        config["logging"]["log_file"] = f"virtual_observatory_{location_name.lower().replace(' ', '_').replace(',', '')}.log"
 
         return config
 
@@ -186,105 +316,80 @@ class VirtualObservatorySetup:
         Returns:
             Tuple of (network, geometry_analysis)
         """
-        network = ObservatoryNetwork(target_lat=latitude, target_lon=longitude)
+        network = _build_network(round(latitude, 4), round(longitude, 4))
         geometry = network.validate_network_geometry()
 
         return network, geometry
 
     def test_interpolation(self, network: ObservatoryNetwork,
-                         location_name: str) -> Dict:
+                         location_name: str,
+                         ensemble_weights: Optional[Dict[str, float]] = None) -> Dict:
         """
         Test interpolation methods for the network.
 
         Args:
             network: Observatory network
             location_name: Location name for context
+            ensemble_weights: IDW/GP ensemble weights (config 'ensemble_weights')
 
         Returns:
             Test results dictionary
         """
         interpolator = SpatialInterpolator(network)
 
-        # Generate realistic test data based on network observatories
-        test_data = {}
-        for obs in network.nearest_four:
-            # Use approximate magnetic field values based on observatory location
-            if obs.latitude > 65:  # High latitude
-                base_field = np.array([57e-6, 1.5e-6, 55e-6])
-            elif obs.latitude > 50:  # Mid latitude
-                base_field = np.array([55e-6, 2.0e-6, 53e-6])
-            else:  # Lower latitude
-                base_field = np.array([52e-6, 2.5e-6, 50e-6])
-
-            # Add small random variation
-            variation = np.random.normal(0, 0.001, 3)
-            test_data[obs.code] = base_field + variation
-
-        # Test all interpolation methods
-        results = {}
+        # Generate realistic test data based on network observatories.
+        # Approximate field values by latitude band, built for all
+        # observatories at once: lower latitude, then mid (>50), then high (>65).
+        lats = np.fromiter((obs.latitude for obs in network.nearest_four), dtype=np.float64)
+        base_field = np.empty((lats.size, 3))
+        base_field[:] = [52e-6, 2.5e-6, 50e-6]
+        base_field[lats > 50] = [55e-6, 2.0e-6, 53e-6]
+        base_field[lats > 65] = [57e-6, 1.5e-6, 55e-6]
+
+        # Add small random variation (single draw for the whole network)
+        variation = np.random.default_rng().normal(0, 0.001, base_field.shape)
+        test_data = {
+            obs.code: row
+            for obs, row in zip(network.nearest_four, base_field + variation)
+        }
 
-        try:
-            # IDW method
-            result_idw = interpolator.inverse_distance_weighting(test_data)
-            quality_idw = interpolator.get_interpolation_quality_score(result_idw)
-            results['IDW'] = {
-                'magnitude': result_idw.magnitude * 1e6,
-                'components': [result_idw.x_component * 1e6,
-                             result_idw.y_component * 1e6,
-                             result_idw.z_component * 1e6],
-                'uncertainty': result_idw.uncertainty_mag * 1e6,
-                'quality': quality_idw,
-                'success': True
-            }
-        except Exception as e:
-            results['IDW'] = {'success': False, 'error': str(e)}
+        # Test all interpolation methods (IDW and GP run once, Ensemble reuses them)
+        results = {}
 
         try:
-            # Gaussian Process method
-            import warnings
+            # One warning-filter save/restore covers all methods
             with warnings.catch_warnings():
                 warnings.simplefilter('ignore')
-                result_gp = interpolator.gaussian_process_interpolation(test_data)
-                quality_gp = interpolator.get_interpolation_quality_score(result_gp)
-                results['GP'] = {
-                    'magnitude': result_gp.magnitude * 1e6,
-                    'components': [result_gp.x_component * 1e6,
-                                 result_gp.y_component * 1e6,
-                                 result_gp.z_component * 1e6],
-                    'uncertainty': result_gp.uncertainty_mag * 1e6,
-                    'quality': quality_gp,
-                    'success': True
-                }
+                method_results = interpolator.run_all(test_data, ensemble_weights, parallel=True)
         except Exception as e:
-            results['GP'] = {'success': False, 'error': str(e)}
-
-        try:
-            # Ensemble method
-            with warnings.catch_warnings():
-                warnings.simplefilter('ignore')
-                result_ensemble = interpolator.ensemble_interpolation(test_data)
-                quality_ensemble = interpolator.get_interpolation_quality_score(result_ensemble)
-                results['Ensemble'] = {
-                    'magnitude': result_ensemble.magnitude * 1e6,
-                    'components': [result_ensemble.x_component * 1e6,
-                                 result_ensemble.y_component * 1e6,
-                                 result_ensemble.z_component * 1e6],
-                    'uncertainty': result_ensemble.uncertainty_mag * 1e6,
-                    'quality': quality_ensemble,
+            return {method: {'success': False, 'error': str(e)}
+                    for method in ('IDW', 'GP', 'Ensemble')}
+
+        for method, result in method_results.items():
+            try:
+                quality = interpolator.get_interpolation_quality_score(result)
+                scaled = ScaledResult.from_tesla(result)  # Tesla -> μT
+                results[method] = {
+                    'magnitude': scaled.magnitude,
+                    'components': scaled.components.tolist(),
+                    'uncertainty': scaled.uncertainty,
+                    'quality': quality,
                     'success': True
                 }
-        except Exception as e:
-            results['Ensemble'] = {'success': False, 'error': str(e)}
+            except Exception as e:
+                results[method] = {'success': False, 'error': str(e)}
 
         return results
 
-    def save_configuration(self, config: Dict, location_name: str) -> str:
+    def save_configuration(self, config: Dict, location_name: str,
+                           network: Optional[ObservatoryNetwork] = None) -> str:
         """
         Save configuration to file.
 
         Args:
             config: Configuration dictionary
             location_name: Location name for filename
+            network: Already-built network for the target (avoids rebuilding it)
 
         Returns:
             Path to saved configuration file
@@ -295,17 +400,28 @@ class VirtualObservatorySetup:
         filepath = os.path.join(self.config_dir, filename)
 
         # Update preferred observatories in config
-        temp_network = ObservatoryNetwork(
-            target_lat=config['target_location']['latitude'],
-            target_lon=config['target_location']['longitude']
-        )
+        if network is None:
+            network = _build_network(round(config['target_location']['latitude'], 4),
+                                     round(config['target_location']['longitude'], 4))
         config['observatory_network']['preferred_observatories'] = [
-            obs.code for obs in temp_network.nearest_four
+            obs.code for obs in network.nearest_four
         ]
 
-        # Save to file
-        with open(filepath, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Leave an existing file alone if only the creation time would change
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, 'rb') as f:
+                    existing = json.loads(f.read())
+                if _config_digest(existing) == _config_digest(config):
+                    return filepath
+            except (ValueError, OSError):
+                pass  # Unreadable or corrupt file: overwrite it
+
+        # Save to file atomically (write temporary file, then rename)
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_serialize_config(config))
+        os.replace(tmp_path, filepath)
 
         return filepath
 
@@ -365,7 +481,8 @@ class VirtualObservatorySetup:
 
         # Step 3: Test interpolation
         print("🧪 Step 3: Testing interpolation methods...")
-        test_results = self.test_interpolation(network, location_name)
+        test_results = self.test_interpolation(network, location_name,
+                                               config['interpolation']['ensemble_weights'])
 
         successful_methods = [method for method, result in test_results.items() if result['success']]
 
@@ -390,7 +507,7 @@ class VirtualObservatorySetup:
 
         # Step 4: Save configuration
         print("💾 Step 4: Saving configuration...")
-        config_path = self.save_configuration(config, location_name)
+        config_path = self.save_configuration(config, location_name, network)
         print(f"Configuration saved to: {config_path}")
 
         # Step 5: Generate usage example
@@ -3,21 +3,152 @@ Database interface for weather station data storage and retrieval.
 """
 import sqlite3
 import json
+import threading
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
 
+_SQL_INSERT_WEATHER = """
+    INSERT INTO weather_data
+    (timestamp, sample_interval, temperature, humidity, pressure,
+     irradiance, wind_direction, rain_gauge_count, anemometer_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# created_at_epoch is set in the insert itself ('now' is fixed for the whole
+# statement, so it matches the created_at default)
+_SQL_INSERT_FLUX = """
+    INSERT INTO magnetic_flux_data (x, y, z, created_at_epoch)
+    VALUES (?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
+"""
+
+_SQL_LATEST_WEATHER = """
+    SELECT timestamp, temperature, humidity, pressure, irradiance,
+           wind_direction, rain_gauge_count, anemometer_count, created_at
+    FROM weather_data
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+_SQL_WEATHER_RANGE = """
+    SELECT timestamp, temperature, humidity, pressure, irradiance,
+           wind_direction, rain_gauge_count, anemometer_count, created_at
+    FROM weather_data
+    WHERE created_at BETWEEN ? AND ?
+    ORDER BY created_at ASC
+"""
+
+_SQL_WEATHER_RANGE_SAMPLED = """
+    SELECT timestamp, temperature, humidity, pressure, irradiance,
+           wind_direction, rain_gauge_count, anemometer_count, created_at
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at) as rn
+        FROM weather_data
+        WHERE created_at BETWEEN ? AND ?
+    )
+    WHERE rn % ? = 1
+    ORDER BY created_at ASC
+"""
+
+_SQL_WEATHER_SUMMARY = """
+    SELECT temperature, humidity, pressure, irradiance,
+           wind_direction, rain_gauge_count, anemometer_count,
+           created_at AS last_updated
+    FROM weather_data
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+_SQL_LATEST_FLUX = """
+    SELECT x, y, z, created_at
+    FROM magnetic_flux_data
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+_SQL_FLUX_RANGE = """
+    SELECT x, y, z, created_at
+    FROM magnetic_flux_data
+    WHERE created_at BETWEEN ? AND ?
+    ORDER BY created_at ASC
+"""
+
+_SQL_FLUX_RANGE_COUNT = """
+    SELECT COUNT(*)
+    FROM magnetic_flux_data
+    WHERE created_at BETWEEN ? AND ?
+"""
+
+_SQL_FLUX_RANGE_SIGNATURE = """
+    SELECT COUNT(*), MAX(id)
+    FROM magnetic_flux_data
+    WHERE created_at BETWEEN ? AND ?
+"""
+
+_SQL_FLUX_RANGE_SAMPLED = """
+    SELECT x, y, z, created_at
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at) as rn
+        FROM magnetic_flux_data
+        WHERE created_at BETWEEN ? AND ?
+    )
+    WHERE rn % ? = 1
+    ORDER BY created_at ASC
+"""
+
+# Structured dtype for get_weather_data_range(as_numpy=True). Nullable integer
+# columns are stored as floats so missing readings come back as NaN.
+WEATHER_DTYPE = np.dtype([
+    ('timestamp', 'i8'),
+    ('temperature', 'f4'),
+    ('humidity', 'f4'),
+    ('pressure', 'f4'),
+    ('irradiance', 'f4'),
+    ('wind_direction', 'f4'),
+    ('rain_gauge_count', 'f8'),
+    ('anemometer_count', 'f8'),
+    ('created_at', 'U26'),
+])
+
+# Structured dtype for get_magnetic_flux_data_range(as_numpy=True).
+FLUX_DTYPE = np.dtype([
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('z', 'f8'),
+    ('created_at', 'U26'),
+])
+
+
 class WeatherDatabase:
     """Handles weather station data storage and retrieval."""
 
     def __init__(self, db_path: str = "/deepsink1/weatherstation/data/weather_data.db"):
         self.db_path = db_path
+
+        # Single long-lived connection shared by all calls. Autocommit mode
+        # (isolation_level=None) commits each statement on its own; the lock
+        # serializes access from the MQTT network thread and GUI callers.
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-16000")
+
         self.init_database()
 
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
     def init_database(self) -> None:
         """Initialize database tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
 
             # Weather data table
             cursor.execute("""
@@ -43,169 +174,193 @@ class WeatherDatabase:
                     x REAL NOT NULL,
                     y REAL NOT NULL,
                     z REAL NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    created_at_epoch INTEGER
                 )
             """)
 
+            # created_at as integer Unix seconds (UTC) for integer range scans.
+            # Our own inserts set it directly. Rows from any other writer that
+            # leaves it NULL (and older databases, once the column is added)
+            # are backfilled here on open; the NULL lookup uses idx_flux_epoch_xyz.
+            flux_columns = {row[1] for row in cursor.execute("PRAGMA table_info(magnetic_flux_data)")}
+            if 'created_at_epoch' not in flux_columns:
+                cursor.execute("ALTER TABLE magnetic_flux_data ADD COLUMN created_at_epoch INTEGER")
+            cursor.execute("""
+                UPDATE magnetic_flux_data
+                SET created_at_epoch = CAST(strftime('%s', created_at) AS INTEGER)
+                WHERE created_at_epoch IS NULL
+            """)
+            # An AFTER INSERT trigger used to fill it per row; even when its
+            # WHEN clause is false it slows every insert
+            cursor.execute("DROP TRIGGER IF EXISTS trg_flux_created_epoch")
+
             # Create indexes for better query performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_weather_timestamp ON weather_data(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_weather_created ON weather_data(created_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_flux_created ON magnetic_flux_data(created_at)")
+            # Covering index: time-range flux reads never touch the table pages.
+            # It supersedes the original created_at-only index.
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_flux_created_xyz ON magnetic_flux_data(created_at, x, y, z)")
+            cursor.execute("DROP INDEX IF EXISTS idx_flux_created")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_flux_epoch_xyz ON magnetic_flux_data(created_at_epoch, x, y, z)")
 
-            conn.commit()
+    @staticmethod
+    def _weather_params(data: Dict) -> Tuple:
+        """Map an MQTT weather payload onto the weather_data insert columns."""
+        return (
+            data.get('utc'),
+            data.get('sampleinterval'),
+            data.get('temperature'),
+            data.get('humidity'),
+            data.get('pressure'),
+            data.get('irradiance'),
+            data.get('winddirectionsensor'),
+            data.get('raingaugecount'),
+            data.get('anemometercount')
+        )
 
     def insert_weather_data(self, data: Dict) -> None:
         """Insert weather data into the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO weather_data
-                (timestamp, sample_interval, temperature, humidity, pressure,
-                 irradiance, wind_direction, rain_gauge_count, anemometer_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                data.get('utc'),
-                data.get('sampleinterval'),
-                data.get('temperature'),
-                data.get('humidity'),
-                data.get('pressure'),
-                data.get('irradiance'),
-                data.get('winddirectionsensor'),
-                data.get('raingaugecount'),
-                data.get('anemometercount')
-            ))
-            conn.commit()
+        with self._lock:
+            self._conn.execute(_SQL_INSERT_WEATHER, self._weather_params(data))
 
     def insert_magnetic_flux_data(self, data: Dict) -> None:
         """Insert magnetic flux data into the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO magnetic_flux_data (x, y, z)
-                VALUES (?, ?, ?)
-            """, (data.get('x'), data.get('y'), data.get('z')))
-            conn.commit()
+        with self._lock:
+            self._conn.execute(_SQL_INSERT_FLUX, (data.get('x'), data.get('y'), data.get('z')))
 
-    def get_latest_weather_data(self, limit: int = 100) -> List[Tuple]:
+    def insert_weather_batch(self, rows: List[Dict]) -> None:
+        """Insert many weather readings in a single transaction."""
+        params = [self._weather_params(data) for data in rows]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_SQL_INSERT_WEATHER, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def insert_magnetic_flux_batch(self, rows: List[Dict]) -> None:
+        """Insert many magnetic flux readings in a single transaction."""
+        params = [(data.get('x'), data.get('y'), data.get('z')) for data in rows]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_SQL_INSERT_FLUX, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get_latest_weather_data(self, limit: int = 100) -> List[sqlite3.Row]:
         """Get the latest weather data entries."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT timestamp, temperature, humidity, pressure, irradiance,
-                       wind_direction, rain_gauge_count, anemometer_count, created_at
-                FROM weather_data
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (limit,))
-            return cursor.fetchall()
+        with self._lock:
+            return self._conn.execute(_SQL_LATEST_WEATHER, (limit,)).fetchall()
 
-    def get_weather_data_range(self, start_time: datetime, end_time: datetime, limit: int = None, sample_interval: int = None) -> List[Tuple]:
-        """Get weather data within a specific time range with optional limits and sampling."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def get_weather_data_range(self, start_time: datetime, end_time: datetime, limit: int = None,
+                               sample_interval: int = None, as_numpy: bool = False):
+        """
+        Get weather data within a specific time range with optional limits and sampling.
 
-            # Build query with optional sampling
-            if sample_interval and sample_interval > 1:
-                # Use row sampling to reduce data points for large ranges
-                query = """
-                    SELECT timestamp, temperature, humidity, pressure, irradiance,
-                           wind_direction, rain_gauge_count, anemometer_count, created_at
-                    FROM (
-                        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at) as rn
-                        FROM weather_data
-                        WHERE created_at BETWEEN ? AND ?
-                    )
-                    WHERE rn % ? = 1
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time, sample_interval)
-            else:
-                query = """
-                    SELECT timestamp, temperature, humidity, pressure, irradiance,
-                           wind_direction, rain_gauge_count, anemometer_count, created_at
-                    FROM weather_data
-                    WHERE created_at BETWEEN ? AND ?
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time)
-
-            # Add limit if specified
-            if limit:
-                query += " LIMIT ?"
-                params = params + (limit,)
+        With ``as_numpy=True`` the rows are returned as a NumPy structured array
+        (fields named after the selected columns, NULLs as NaN) built directly
+        from the cursor, avoiding a Python tuple per row.
+        """
+        # Use row sampling to reduce data points for large ranges
+        if sample_interval and sample_interval > 1:
+            query = _SQL_WEATHER_RANGE_SAMPLED
+            params = (start_time, end_time, sample_interval)
+        else:
+            query = _SQL_WEATHER_RANGE
+            params = (start_time, end_time)
 
+        # Add limit if specified
+        if limit:
+            query += " LIMIT ?"
+            params = params + (limit,)
+
+        with self._lock:
+            cursor = self._conn.cursor()
+            if as_numpy:
+                cursor.row_factory = None  # plain tuples for np.fromiter
+                cursor.execute(query, params)
+                return np.fromiter(cursor, dtype=WEATHER_DTYPE)
             cursor.execute(query, params)
             return cursor.fetchall()
 
-    def get_latest_magnetic_flux_data(self, limit: int = 100) -> List[Tuple]:
+    def get_latest_magnetic_flux_data(self, limit: int = 100) -> List[sqlite3.Row]:
         """Get the latest magnetic flux data entries."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT x, y, z, created_at
-                FROM magnetic_flux_data
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (limit,))
-            return cursor.fetchall()
+        with self._lock:
+            return self._conn.execute(_SQL_LATEST_FLUX, (limit,)).fetchall()
+
+    def get_magnetic_flux_data_range(self, start_time: datetime, end_time: datetime, limit: int = None,
+                                     sample_interval: int = None, as_numpy: bool = False,
+                                     as_columns: bool = False):
+        """
+        Get magnetic flux data within a specific time range with optional limits and sampling.
+
+        With ``as_numpy=True`` the rows are returned as a NumPy structured array
+        with fields x, y, z and created_at (see FLUX_DTYPE). With
+        ``as_columns=True`` they are returned as a dict mapping each of those
+        field names to its own contiguous array.
+        """
+        # Use row sampling to reduce data points for large ranges
+        if sample_interval and sample_interval > 1:
+            query = _SQL_FLUX_RANGE_SAMPLED
+            params = (start_time, end_time, sample_interval)
+        else:
+            query = _SQL_FLUX_RANGE
+            params = (start_time, end_time)
+
+        # Add limit if specified
+        if limit:
+            query += " LIMIT ?"
+            params = params + (limit,)
+
+        with self._lock:
+            if as_numpy or as_columns:
+                rows = self._fetch_flux_array(query, params, start_time, end_time, limit, sample_interval)
+                if as_columns:
+                    return {name: np.ascontiguousarray(rows[name]) for name in FLUX_DTYPE.names}
+                return rows
+            return self._conn.execute(query, params).fetchall()
 
-    def get_magnetic_flux_data_range(self, start_time: datetime, end_time: datetime, limit: int = None, sample_interval: int = None) -> List[Tuple]:
-        """Get magnetic flux data within a specific time range with optional limits and sampling."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def _fetch_flux_array(self, query: str, params: Tuple, start_time: datetime, end_time: datetime,
+                          limit: Optional[int], sample_interval: Optional[int]) -> np.ndarray:
+        """
+        Run a flux range query straight into a FLUX_DTYPE array.
 
-            # Build query with optional sampling
+        The result size is counted first (inside the same read transaction, so
+        both statements see one snapshot) and the array is allocated once at
+        that size instead of growing while rows stream in. Caller holds the lock.
+        """
+        self._conn.execute("BEGIN")
+        try:
+            n = self._conn.execute(_SQL_FLUX_RANGE_COUNT, (start_time, end_time)).fetchone()[0]
             if sample_interval and sample_interval > 1:
-                # Use row sampling to reduce data points for large ranges
-                query = """
-                    SELECT x, y, z, created_at
-                    FROM (
-                        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at) as rn
-                        FROM magnetic_flux_data
-                        WHERE created_at BETWEEN ? AND ?
-                    )
-                    WHERE rn % ? = 1
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time, sample_interval)
-            else:
-                query = """
-                    SELECT x, y, z, created_at
-                    FROM magnetic_flux_data
-                    WHERE created_at BETWEEN ? AND ?
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time)
-
-            # Add limit if specified
+                n = -(-n // sample_interval)  # rows with rn % k = 1
             if limit:
-                query += " LIMIT ?"
-                params = params + (limit,)
-
+                n = min(n, limit)
+            cursor = self._conn.cursor()
+            cursor.row_factory = None  # plain tuples for np.fromiter
             cursor.execute(query, params)
-            return cursor.fetchall()
+            return np.fromiter(cursor, dtype=FLUX_DTYPE, count=n)
+        finally:
+            self._conn.execute("COMMIT")
+
+    def get_magnetic_flux_range_signature(self, start_time: datetime, end_time: datetime) -> Tuple[int, Optional[int]]:
+        """
+        Cheap fingerprint of the flux rows in a time range: (row count, max id).
+
+        Answered from the covering index; changes whenever rows are added to
+        or removed from the range, so callers can key caches on it.
+        """
+        with self._lock:
+            return tuple(self._conn.execute(_SQL_FLUX_RANGE_SIGNATURE, (start_time, end_time)).fetchone())
 
     def get_current_weather_summary(self) -> Optional[Dict]:
         """Get the most recent weather reading as a summary."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT temperature, humidity, pressure, irradiance,
-                       wind_direction, rain_gauge_count, anemometer_count, created_at
-                FROM weather_data
-                ORDER BY created_at DESC
-                LIMIT 1
-            """)
-            row = cursor.fetchone()
-            if row:
-                return {
-                    'temperature': row[0],
-                    'humidity': row[1],
-                    'pressure': row[2],
-                    'irradiance': row[3],
-                    'wind_direction': row[4],
-                    'rain_gauge_count': row[5],
-                    'anemometer_count': row[6],
-                    'last_updated': row[7]
-                }
-            return None
\ No newline at end of file
+        with self._lock:
+            row = self._conn.execute(_SQL_WEATHER_SUMMARY).fetchone()
+        return dict(row) if row else None
@@ -40,8 +40,9 @@ def main():
         print()
 
         print("4 Nearest USGS Observatories:")
+        weights = predictor.network.get_spatial_weights()
         for i, obs in enumerate(predictor.network.nearest_four, 1):
-            weight = predictor.network.get_spatial_weights()[i-1]
+            weight = weights[i-1]
             print(f"  {i}. {obs.code} - {obs.name}")
             print(f"     Distance: {obs.distance_km:.0f} km, Weight: {weight:.1%}")
             print(f"     Established: {obs.established}")
@@ -60,11 +61,15 @@ def main():
             'DED': np.array([56.1e-6, 1.9e-6, 54.8e-6])   # Deadhorse - North Slope
         }
 
-        for code, data in usgs_data.items():
+        # Stack readings into a (4, 3) matrix in μT and take all magnitudes at once
+        codes = list(usgs_data)
+        M = np.stack([usgs_data[c] for c in codes], axis=0) * 1e6
+        mags = np.linalg.norm(M, axis=1)
+
+        for code, data, mag in zip(codes, M, mags):
             obs = predictor.network.get_observatory_by_code(code)
-            mag = np.linalg.norm(data) * 1e6
             print(f"  {code} ({obs.name}): {mag:.1f} μT")
-            print(f"    Components: X={data[0]*1e6:.1f}, Y={data[1]*1e6:.1f}, Z={data[2]*1e6:.1f} μT")
+            print(f"    Components: X={data[0]:.1f}, Y={data[1]:.1f}, Z={data[2]:.1f} μT")
 
         print()
 
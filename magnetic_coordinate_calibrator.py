@@ -21,14 +21,160 @@ Usage:
 import argparse
 import sqlite3
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import pandas as pd
 from datetime import datetime, timedelta
 import json
 from scipy.optimize import minimize
-from scipy.spatial.transform import Rotation as R
 import os
 
+# Optional parallel multi-start optimization
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# Number of L-BFGS-B starting orientations tried by optimize_transformation
+N_STARTS = 8
+# Number of best coarse (float32) candidates refined at full precision, in
+# addition to the flat-orientation start, which is always refined
+N_POLISH = 3
+
+# Optional JIT compilation of the calibration residual kernels
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _stack_components(data):
+    """Stack a {'x', 'y', 'z'} dict of component arrays into a contiguous (N, 3) array."""
+    return np.ascontiguousarray(np.stack([data['x'], data['y'], data['z']], axis=1), dtype=np.float64)
+
+
+def _sql_time(t):
+    """Format a datetime query bound as an ISO string ('YYYY-MM-DD HH:MM:SS[.ffffff]').
+
+    This is the text sqlite3's default adapter produced, so BETWEEN keeps
+    comparing against the indexed timestamp columns exactly as before.
+    """
+    return t.isoformat(sep=' ') if isinstance(t, datetime) else t
+
+
+def _parse_timestamps(column):
+    """Parse a column of SQLite timestamp strings into naive UTC datetime64[ns] values."""
+    return pd.to_datetime(column, format='ISO8601', utc=True).dt.tz_localize(None).to_numpy()
+
+
+def _naive_ns(times):
+    """Timestamps as int64 nanoseconds, dropping any timezone information."""
+    times = np.asarray(times)
+    if times.dtype.kind != 'M':
+        times = np.array([t.replace(tzinfo=None) if getattr(t, 'tzinfo', None) else t
+                          for t in times], dtype='datetime64[ns]')
+    return times.astype('datetime64[ns]').view('i8')
+
+
+def _column_corr(A, B):
+    """Pearson correlation between matching columns of two (N, k) arrays."""
+    A = A - A.mean(axis=0)
+    B = B - B.mean(axis=0)
+    return (A * B).sum(axis=0) / np.sqrt((A * A).sum(axis=0) * (B * B).sum(axis=0))
+
+
+def _euler_xyz_matrix(a, b, c):
+    """Rotation matrix for extrinsic x-y-z Euler angles (radians).
+
+    Equivalent to scipy's Rotation.from_euler('xyz', [a, b, c]).as_matrix(),
+    i.e. Rz(c) @ Ry(b) @ Rx(a), built directly from six sin/cos evaluations.
+    """
+    cx, sx = np.cos(a), np.sin(a)
+    cy, sy = np.cos(b), np.sin(b)
+    cz, sz = np.cos(c), np.sin(c)
+    return np.array([
+        [cy * cz, sx * sy * cz - cx * sz, cx * sy * cz + sx * sz],
+        [cy * sz, sx * sy * sz + cx * cz, cx * sy * sz - sx * cz],
+        [-sy, sx * cy, cx * cy]
+    ])
+
+
+def _euler_xyz_derivatives(a, b, c):
+    """Partial derivatives of _euler_xyz_matrix(a, b, c) w.r.t. a, b and c.
+
+    Returns:
+        (3, 3, 3) array where [k] is d(Rz @ Ry @ Rx)/d(angle k)
+    """
+    cx, sx = np.cos(a), np.sin(a)
+    cy, sy = np.cos(b), np.sin(b)
+    cz, sz = np.cos(c), np.sin(c)
+
+    Rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    Ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    Rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    dRx = np.array([[0, 0, 0], [0, -sx, -cx], [0, cx, -sx]])
+    dRy = np.array([[-sy, 0, cy], [0, 0, 0], [-cy, 0, -sy]])
+    dRz = np.array([[-sz, -cz, 0], [cz, -sz, 0], [0, 0, 0]])
+
+    return np.stack([Rz @ Ry @ dRx, Rz @ dRy @ Rx, dRz @ Ry @ Rx])
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rms(L, U, s, Rm, o):
+        """RMS of (L*s) @ Rm.T + o - U in a single pass without (N, 3) temporaries.
+
+        L and U may be float32; the sum of squares is always accumulated in float64.
+        """
+        n = L.shape[0]
+        ss = 0.0
+        for i in prange(n):
+            x = L[i, 0] * s[0]
+            y = L[i, 1] * s[1]
+            z = L[i, 2] * s[2]
+            rx = Rm[0, 0] * x + Rm[0, 1] * y + Rm[0, 2] * z + o[0] - U[i, 0]
+            ry = Rm[1, 0] * x + Rm[1, 1] * y + Rm[1, 2] * z + o[1] - U[i, 1]
+            rz = Rm[2, 0] * x + Rm[2, 1] * y + Rm[2, 2] * z + o[2] - U[i, 2]
+            ss += rx * rx + ry * ry + rz * rz
+        return np.sqrt(ss / n)
+
+    @njit(fastmath=True, cache=True)
+    def _residual_moments(L, U, s, Rm, o):
+        """Sum of squared residuals, residual/L cross-moment (3, 3) and residual sums."""
+        ss = 0.0
+        G = np.zeros((3, 3))
+        dsum = np.zeros(3)
+        r = np.empty(3)
+        for i in range(L.shape[0]):
+            x = L[i, 0] * s[0]
+            y = L[i, 1] * s[1]
+            z = L[i, 2] * s[2]
+            for j in range(3):
+                r[j] = Rm[j, 0] * x + Rm[j, 1] * y + Rm[j, 2] * z + o[j] - U[i, j]
+                dsum[j] += r[j]
+                for k in range(3):
+                    G[j, k] += r[j] * L[i, k]
+            ss += r[0] * r[0] + r[1] * r[1] + r[2] * r[2]
+        return ss, G, dsum
+else:
+    def _rms(L, U, s, Rm, o):
+        """RMS of (L*s) @ Rm.T + o - U."""
+        diff = _residuals(L, U, s, Rm, o)
+        return np.sqrt(np.einsum('ij,ij->', diff, diff, dtype=np.float64) / len(L))
+
+    def _residual_moments(L, U, s, Rm, o):
+        """Sum of squared residuals, residual/L cross-moment (3, 3) and residual sums."""
+        diff = _residuals(L, U, s, Rm, o)
+        return (np.einsum('ij,ij->', diff, diff, dtype=np.float64),
+                (diff.T @ L).astype(np.float64),
+                diff.sum(axis=0, dtype=np.float64))
+
+    def _residuals(L, U, s, Rm, o):
+        """(N, 3) residuals computed in the precision of L (reductions stay float64)."""
+        dt = L.dtype
+        return (L * s.astype(dt)) @ Rm.T.astype(dt) + o.astype(dt) - U
+
+
 class MagneticCoordinateCalibrator:
     """Calibrates sensor orientation and scale using USGS reference data."""
 
@@ -36,6 +182,7 @@ class MagneticCoordinateCalibrator:
         self.db_path = db_path
         self.best_transformation = None
         self.calibration_results = None
+        self._conn = None
 
     def load_aligned_data(self, observatory_code, hours=8):
         """Load and align local and USGS data for calibration."""
@@ -45,9 +192,12 @@ class MagneticCoordinateCalibrator:
         end_time = datetime.now()
         start_time = end_time - timedelta(hours=hours)
 
-        # Load both datasets
-        local_data = self.load_local_data(start_time, end_time)
-        usgs_data = self.load_usgs_data(observatory_code, start_time, end_time)
+        # Load both datasets over one connection; nothing later needs the database
+        try:
+            local_data = self.load_local_data(start_time, end_time)
+            usgs_data = self.load_usgs_data(observatory_code, start_time, end_time)
+        finally:
+            self.close()
 
         if not local_data or not usgs_data:
             print("Error: Could not load required data")
@@ -63,44 +213,40 @@ class MagneticCoordinateCalibrator:
         print(f"Loaded {len(aligned_local['x'])} aligned data points for calibration")
         return aligned_local, aligned_usgs
 
+    def _connect(self):
+        """Return the shared read connection, opening it tuned for bulk range scans."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute("PRAGMA mmap_size=268435456")
+            self._conn.execute("PRAGMA cache_size=-65536")
+        return self._conn
+
+    def close(self):
+        """Close the database connection, if open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     def load_local_data(self, start_time, end_time):
         """Load local sensor data (raw LSb values)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            conn = self._connect()
+            df = pd.read_sql_query("""
                 SELECT x, y, z, created_at
                 FROM magnetic_flux_data
                 WHERE created_at BETWEEN ? AND ?
                 ORDER BY created_at ASC
-            """, (start_time, end_time))
+            """, conn, params=(_sql_time(start_time), _sql_time(end_time)))
 
-            rows = cursor.fetchall()
-            conn.close()
-
-            if not rows:
+            if df.empty:
                 return None
 
-            times = []
-            x_values = []
-            y_values = []
-            z_values = []
-
-            for row in rows:
-                x, y, z, timestamp_str = row
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', ''))
-                times.append(timestamp)
-                # Store raw LSb values for calibration
-                x_values.append(float(x))
-                y_values.append(float(y))
-                z_values.append(float(z))
-
+            # Store raw LSb values for calibration
             return {
-                'times': np.array(times),
-                'x': np.array(x_values),
-                'y': np.array(y_values),
-                'z': np.array(z_values)
+                'times': _parse_timestamps(df['created_at']),
+                'x': df['x'].to_numpy(dtype=np.float64),
+                'y': df['y'].to_numpy(dtype=np.float64),
+                'z': df['z'].to_numpy(dtype=np.float64)
             }
 
         except Exception as e:
@@ -110,41 +256,25 @@ class MagneticCoordinateCalibrator:
     def load_usgs_data(self, observatory_code, start_time, end_time):
         """Load USGS reference data (Tesla values)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            conn = self._connect()
+            df = pd.read_sql_query("""
                 SELECT x, y, z, data_timestamp
                 FROM usgs_magnetic_data
                 WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
                 ORDER BY data_timestamp ASC
-            """, (observatory_code, start_time, end_time))
-
-            rows = cursor.fetchall()
-            conn.close()
+            """, conn, params=(observatory_code, _sql_time(start_time), _sql_time(end_time)))
 
-            if not rows:
+            if df.empty:
                 return None
 
-            times = []
-            x_values = []
-            y_values = []
-            z_values = []
-
-            for row in rows:
-                x, y, z, timestamp_str = row
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', ''))
-                times.append(timestamp)
-                # Convert Tesla to nanotesla for easier comparison
-                x_values.append(float(x) * 1e9)
-                y_values.append(float(y) * 1e9)
-                z_values.append(float(z) * 1e9)
+            # Convert Tesla to nanotesla for easier comparison
+            xyz = df[['x', 'y', 'z']].to_numpy(dtype=np.float64) * 1e9
 
             return {
-                'times': np.array(times),
-                'x': np.array(x_values),
-                'y': np.array(y_values),
-                'z': np.array(z_values)
+                'times': _parse_timestamps(df['data_timestamp']),
+                'x': xyz[:, 0],
+                'y': xyz[:, 1],
+                'z': xyz[:, 2]
             }
 
         except Exception as e:
@@ -153,77 +283,104 @@ class MagneticCoordinateCalibrator:
 
     def align_time_series(self, local_data, usgs_data, tolerance_minutes=5):
         """Align local and USGS data by timestamp."""
-        tolerance = timedelta(minutes=tolerance_minutes)
-
-        aligned_local = {'x': [], 'y': [], 'z': []}
-        aligned_usgs = {'x': [], 'y': [], 'z': []}
-
-        # Convert timestamps to naive for comparison
-        local_times = [t.replace(tzinfo=None) if hasattr(t, 'tzinfo') and t.tzinfo else t
-                      for t in local_data['times']]
-        usgs_times = [t.replace(tzinfo=None) if hasattr(t, 'tzinfo') and t.tzinfo else t
-                     for t in usgs_data['times']]
-
-        usgs_times = np.array(usgs_times)
-
-        for i, local_time in enumerate(local_times):
-            time_diffs = np.abs(usgs_times - local_time)
-            min_diff_idx = np.argmin(time_diffs)
-
-            if time_diffs[min_diff_idx] <= tolerance:
-                aligned_local['x'].append(local_data['x'][i])
-                aligned_local['y'].append(local_data['y'][i])
-                aligned_local['z'].append(local_data['z'][i])
+        tolerance_ns = int(tolerance_minutes * 60 * 1e9)
+
+        # Work in int64 nanoseconds so the nearest-neighbour search is a single
+        # binary search over the sorted USGS times rather than a scan per sample
+        lt = _naive_ns(local_data['times'])
+        ut = _naive_ns(usgs_data['times'])
+
+        order = np.argsort(ut, kind='stable')
+        ut_s = ut[order]
+
+        if len(ut_s) > 1:
+            idx = np.clip(np.searchsorted(ut_s, lt), 1, len(ut_s) - 1)
+            left = ut_s[idx - 1]
+            right = ut_s[idx]
+            # Ties go to the earlier sample, as argmin did
+            chosen = np.where((right - lt) < (lt - left), idx, idx - 1)
+        else:
+            chosen = np.zeros(len(lt), dtype=np.intp)
 
-                aligned_usgs['x'].append(usgs_data['x'][min_diff_idx])
-                aligned_usgs['y'].append(usgs_data['y'][min_diff_idx])
-                aligned_usgs['z'].append(usgs_data['z'][min_diff_idx])
+        mask = np.abs(ut_s[chosen] - lt) <= tolerance_ns
+        local_idx = np.nonzero(mask)[0]
+        usgs_idx = order[chosen[mask]]
 
-        # Convert to numpy arrays
+        aligned_local = {}
+        aligned_usgs = {}
         for key in ['x', 'y', 'z']:
-            aligned_local[key] = np.array(aligned_local[key])
-            aligned_usgs[key] = np.array(aligned_usgs[key])
+            aligned_local[key] = np.asarray(local_data[key])[local_idx]
+            aligned_usgs[key] = np.asarray(usgs_data[key])[usgs_idx]
 
         return aligned_local, aligned_usgs
 
-    def transformation_objective(self, params, local_data, usgs_data):
-        """Objective function for transformation optimization."""
-        # Extract parameters
-        # params = [scale_x, scale_y, scale_z, rot_x, rot_y, rot_z, offset_x, offset_y, offset_z]
-        scale_factors = params[0:3]
-        rotation_angles = params[3:6]  # Euler angles in radians
-        offsets = params[6:9]
-
-        # Apply scale factors to local data (convert LSb to nT)
-        local_scaled = np.column_stack([
-            local_data['x'] * scale_factors[0],
-            local_data['y'] * scale_factors[1],
-            local_data['z'] * scale_factors[2]
-        ])
-
-        # Apply rotation
-        rotation = R.from_euler('xyz', rotation_angles)
-        local_rotated = rotation.apply(local_scaled)
-
-        # Apply offsets
-        local_transformed = local_rotated + offsets
-
-        # Calculate RMS error against USGS reference
-        usgs_vectors = np.column_stack([usgs_data['x'], usgs_data['y'], usgs_data['z']])
-
-        errors = local_transformed - usgs_vectors
-        rms_error = np.sqrt(np.mean(np.sum(errors**2, axis=1)))
-
-        return rms_error
+    def transformation_objective(self, params, L, U):
+        """Objective function for transformation optimization.
+
+        Args:
+            params: [scale_x, scale_y, scale_z, rot_x, rot_y, rot_z, offset_x, offset_y, offset_z]
+            L: (N, 3) raw local sensor vectors (LSb)
+            U: (N, 3) USGS reference vectors (nT)
+
+        Returns:
+            RMS vector error in nT
+        """
+        # Scale (LSb -> nT), rotate (Euler angles in radians), offset
+        params = np.asarray(params, dtype=np.float64)
+        Rm = _euler_xyz_matrix(*params[3:6])
+
+        return _rms(L, U, params[0:3], Rm, params[6:9])
+
+    def _obj_and_grad(self, params, L, U):
+        """RMS objective and its analytic gradient for L-BFGS-B (jac=True).
+
+        With D = (L*s) @ R.T + o - U and J = sqrt(mean(|D|^2)), every partial
+        derivative reduces to a 3x3 cross-moment of the residuals:
+        G = D.T @ L gives dJ/ds = diag(R.T @ G) / (N*J) and
+        dJ/dtheta_k = sum(dR_k * (G * s)) / (N*J), while dJ/do = mean(D) / J.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        s = params[0:3]
+        Rm = _euler_xyz_matrix(*params[3:6])
+        ss, G, dsum = _residual_moments(L, U, s, Rm, params[6:9])
+
+        n = len(L)
+        rms = np.sqrt(ss / n)
+        if rms == 0:
+            return rms, np.zeros(9)
+
+        dR = _euler_xyz_derivatives(*params[3:6])
+
+        grad = np.empty(9)
+        grad[0:3] = np.einsum('jk,jk->k', Rm, G)
+        grad[3:6] = np.einsum('kij,ij->k', dR, G * s)
+        grad[6:9] = dsum
+
+        return rms, grad / (n * rms)
+
+    def _rot_offset_obj_and_grad(self, params, Ls, U):
+        """Objective and gradient over rotation and offsets only.
+
+        Args:
+            params: [rot_x, rot_y, rot_z, offset_x, offset_y, offset_z]
+            Ls: (N, 3) local vectors already multiplied by the scale factors
+            U: (N, 3) USGS reference vectors (nT)
+        """
+        rms, grad = self._obj_and_grad(np.concatenate((np.ones(3), params)), Ls, U)
+        return rms, grad[3:9]
 
     def optimize_transformation(self, local_data, usgs_data):
         """Find optimal transformation parameters."""
         print("Optimizing coordinate transformation...")
 
+        # Stack components once as contiguous (N, 3) arrays for the objective
+        L = _stack_components(local_data)
+        U = _stack_components(usgs_data)
+
         # Initial parameter estimates
         # Rough scale factor estimate (convert LSb to nT)
-        usgs_mag = np.sqrt(usgs_data['x']**2 + usgs_data['y']**2 + usgs_data['z']**2)
-        local_mag = np.sqrt(local_data['x']**2 + local_data['y']**2 + local_data['z']**2)
+        usgs_mag = np.sqrt(np.einsum('ij,ij->i', U, U))
+        local_mag = np.sqrt(np.einsum('ij,ij->i', L, L))
 
         initial_scale = np.mean(usgs_mag) / np.mean(local_mag)
 
@@ -236,6 +393,12 @@ class MagneticCoordinateCalibrator:
 
         print(f"Initial scale estimate: {initial_scale:.2e}")
 
+        # Coarse multi-start search runs on float32 copies, which halve the
+        # memory traffic of the streaming objective (the kernels accumulate
+        # in float64); only the final polish uses the full-precision arrays
+        L32 = L.astype(np.float32)
+        U32 = U.astype(np.float32)
+
         # Parameter bounds
         bounds = [
             (initial_scale*0.1, initial_scale*10),  # scale_x
@@ -249,15 +412,48 @@ class MagneticCoordinateCalibrator:
             (-50000, 50000)                         # offset_z (nT)
         ]
 
-        # Optimize
-        result = minimize(
-            self.transformation_objective,
-            initial_params,
-            args=(local_data, usgs_data),
-            method='L-BFGS-B',
-            bounds=bounds,
-            options={'maxiter': 1000, 'disp': True}
-        )
+        # Optimize from the flat orientation plus random Euler seeds so a sensor
+        # mounted far from level does not leave us in a local minimum
+        seeds = [np.zeros(3)] + [np.random.default_rng(k).uniform(-np.pi, np.pi, 3)
+                                 for k in range(N_STARTS - 1)]
+        x0_list = [np.concatenate((initial_params[0:3], seed, initial_params[6:9])) for seed in seeds]
+
+        # Two stages per start: with the scale held at its magnitude-ratio
+        # estimate only rotation and offsets are fitted, against a prescaled
+        # copy of L, then all nine parameters are fitted together
+        Ls32 = L32 * np.asarray(initial_params[0:3], dtype=np.float32)
+        coarse = {'ftol': 1e-6, 'maxiter': 300}
+        # The scale factors (~1e2) and offsets (~1e3 nT) are poorly conditioned
+        # against the angles, so the first joint steps reduce the RMS only
+        # slightly; a loose ftol stops there with the scales still at their
+        # initial estimate, so the polish runs to a tight tolerance
+        fine = {'ftol': 1e-12, 'maxiter': 1000}
+
+        def run(x0):
+            stage1 = minimize(self._rot_offset_obj_and_grad, x0[3:9], args=(Ls32, U32),
+                              method='L-BFGS-B', jac=True, bounds=bounds[3:9], options=coarse)
+            x1 = np.concatenate((x0[0:3], stage1.x))
+            return minimize(self._obj_and_grad, x1, args=(L32, U32), method='L-BFGS-B',
+                            jac=True, bounds=bounds, options=coarse)
+
+        def polish(x0):
+            return minimize(self._obj_and_grad, x0, args=(L, U), method='L-BFGS-B',
+                            jac=True, bounds=bounds, options=fine)
+
+        if JOBLIB_AVAILABLE:
+            candidates = Parallel(n_jobs=-1, prefer='threads')(delayed(run)(x0) for x0 in x0_list)
+        else:
+            candidates = [run(x0) for x0 in x0_list]
+
+        # Only the flat start and the most promising coarse candidates are
+        # refined in float64
+        flat = candidates[0]
+        ranked = sorted(candidates[1:], key=lambda r: r.fun)
+        results = [polish(r.x) for r in [flat] + ranked[:N_POLISH]]
+
+        converged = [r for r in results if r.success]
+        result = min(converged or results, key=lambda r: r.fun)
+        print(f"Best of {len(candidates)} starts, {len(results)} refined ({len(converged)} converged)")
 
         if result.success:
             print(f"Optimization successful! RMS error: {result.fun:.2f} nT")
@@ -274,19 +470,10 @@ class MagneticCoordinateCalibrator:
 
     def apply_transformation(self, local_data, transformation):
         """Apply the optimized transformation to local data."""
-        # Apply scale factors
-        local_scaled = np.column_stack([
-            local_data['x'] * transformation['scale_factors'][0],
-            local_data['y'] * transformation['scale_factors'][1],
-            local_data['z'] * transformation['scale_factors'][2]
-        ])
-
-        # Apply rotation
-        rotation = R.from_euler('xyz', transformation['rotation_angles'])
-        local_rotated = rotation.apply(local_scaled)
-
-        # Apply offsets
-        local_transformed = local_rotated + transformation['offsets']
+        # Scale, rotate and offset in one pass: (L*s) @ R.T + o
+        L = _stack_components(local_data)
+        Rm = _euler_xyz_matrix(*transformation['rotation_angles'])
+        local_transformed = (L * transformation['scale_factors']) @ Rm.T + transformation['offsets']
 
         return {
             'x': local_transformed[:, 0],
@@ -318,39 +505,34 @@ class MagneticCoordinateCalibrator:
         print(f"  Y: {transformation['offsets'][1]:.2f}")
         print(f"  Z: {transformation['offsets'][2]:.2f}")
 
-        # Calculate statistics
-        components = ['x', 'y', 'z']
+        # Calculate statistics for all three components at once on (N, 3) arrays
+        O = _stack_components(local_original) * 9.174e-8 * 1e9  # Original scaling, converted to nT
+        T = _stack_components(local_transformed)
+        U = _stack_components(usgs_data)
+
+        orig_rms = np.sqrt(np.mean((O - U)**2, axis=0))
+        trans_rms = np.sqrt(np.mean((T - U)**2, axis=0))
+        orig_corr = _column_corr(O, U)
+        trans_corr = _column_corr(T, U)
+        improvement = ((orig_rms - trans_rms) / orig_rms) * 100
+        usgs_mean = U.mean(axis=0)
 
         print(f"\nBEFORE vs AFTER TRANSFORMATION:")
         print("-" * 60)
 
-        for i, comp in enumerate(components):
-            # Original comparison (scaled by initial calibration)
-            original_scaled = local_original[comp] * 9.174e-8 * 1e9  # Convert to nT
-            usgs_vals = usgs_data[comp]
-            transformed_vals = local_transformed[comp]
-
-            # Statistics
-            orig_rms = np.sqrt(np.mean((original_scaled - usgs_vals)**2))
-            trans_rms = np.sqrt(np.mean((transformed_vals - usgs_vals)**2))
-
-            orig_corr = np.corrcoef(original_scaled, usgs_vals)[0, 1]
-            trans_corr = np.corrcoef(transformed_vals, usgs_vals)[0, 1]
-
-            improvement = ((orig_rms - trans_rms) / orig_rms) * 100
-
+        for i, comp in enumerate(['x', 'y', 'z']):
             print(f"\n{comp.upper()} Component:")
-            print(f"  USGS Mean:           {np.mean(usgs_vals):8.2f} nT")
-            print(f"  Original RMS Error:  {orig_rms:8.2f} nT (r={orig_corr:.3f})")
-            print(f"  Transformed RMS:     {trans_rms:8.2f} nT (r={trans_corr:.3f})")
-            print(f"  Improvement:         {improvement:8.1f}%")
+            print(f"  USGS Mean:           {usgs_mean[i]:8.2f} nT")
+            print(f"  Original RMS Error:  {orig_rms[i]:8.2f} nT (r={orig_corr[i]:.3f})")
+            print(f"  Transformed RMS:     {trans_rms[i]:8.2f} nT (r={trans_corr[i]:.3f})")
+            print(f"  Improvement:         {improvement[i]:8.1f}%")
 
         # Overall magnitude comparison
-        usgs_mag = np.sqrt(usgs_data['x']**2 + usgs_data['y']**2 + usgs_data['z']**2)
-        trans_mag = np.sqrt(local_transformed['x']**2 + local_transformed['y']**2 + local_transformed['z']**2)
+        usgs_mag = np.sqrt(np.einsum('ij,ij->i', U, U))
+        trans_mag = np.sqrt(np.einsum('ij,ij->i', T, T))
 
         mag_rms = np.sqrt(np.mean((trans_mag - usgs_mag)**2))
-        mag_corr = np.corrcoef(trans_mag, usgs_mag)[0, 1]
+        mag_corr = _column_corr(trans_mag[:, None], usgs_mag[:, None])[0]
 
         print(f"\nMAGNITUDE:")
         print(f"  USGS Mean:           {np.mean(usgs_mag):8.2f} nT")
@@ -363,6 +545,13 @@ class MagneticCoordinateCalibrator:
 
     def create_calibration_plots(self, local_original, local_transformed, usgs_data, save=False):
         """Create before/after comparison plots."""
+        # Imported lazily so runs that never plot skip matplotlib start-up;
+        # saving only needs the non-interactive backend
+        import matplotlib
+        if save:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(2, 3, figsize=(15, 10))
         fig.suptitle('Coordinate Transformation Results', fontsize=16, fontweight='bold')
 
@@ -391,6 +580,7 @@ class MagneticCoordinateCalibrator:
             ax.legend()
 
         # After transformation (bottom row)
+        trans_corr = _column_corr(_stack_components(local_transformed), _stack_components(usgs_data))
         for i, (comp, name) in enumerate(zip(components, component_names)):
             ax = axes[1, i]
 
@@ -404,9 +594,8 @@ class MagneticCoordinateCalibrator:
             max_val = max(np.max(transformed_vals), np.max(usgs_vals))
             ax.plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.5, label='Perfect correlation')
 
-            # Calculate and display correlation
-            corr = np.corrcoef(transformed_vals, usgs_vals)[0, 1]
-            ax.text(0.05, 0.95, f'r = {corr:.3f}', transform=ax.transAxes,
+            # Display correlation
+            ax.text(0.05, 0.95, f'r = {trans_corr[i]:.3f}', transform=ax.transAxes,
                    verticalalignment='top', bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
 
             ax.set_xlabel(f'USGS {name} (nT)')
@@ -35,6 +35,9 @@ Examples:
 
     # Save calibrated plots to files
     python magnetic_flux_3d_plotter.py --save --output-dir plots/
+
+    # Rotate a long trajectory interactively on the GPU (requires vispy)
+    python magnetic_flux_3d_plotter.py --days 7 --plots trajectory --backend vispy
 """
 
 import argparse
@@ -43,11 +46,46 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.dates as mdates
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.collections import LineCollection
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from datetime import datetime, timedelta
+import hashlib
+import math
 import os
 import sys
 import json
 
+# Optional JIT compilation of the derived-quantity kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional threaded expression evaluation for the derive step when numba is
+# not installed
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+# Optional vectorized ISO 8601 parser for database timestamps
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# Optional OpenGL rendering for the interactive 3D trajectory
+try:
+    from vispy import scene
+    VISPY_AVAILABLE = True
+except ImportError:
+    VISPY_AVAILABLE = False
+
 # Add project directory to path for database import
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -57,6 +95,198 @@ except ImportError:
     print("Error: Could not import WeatherDatabase. Make sure database.py is in the same directory.")
     sys.exit(1)
 
+from magnetic_flux_common import CACHE_DIR, cache_time_range, read_cache, write_cache, save_figures_parallel
+
+# Points drawn per time-series line and per polar/XY scatter; longer series are
+# decimated before they reach matplotlib
+DECIMATE_TARGET = 4000
+SCATTER_MAX_POINTS = 5000
+
+# Number of arrows drawn by create_3d_vector_plot
+VECTOR_MAX_ARROWS = 50
+
+# Colormaps and normalization shared by every time-colored artist; colors are
+# computed once as RGBA arrays and the colorbars use a standalone mappable
+_CMAPS = {name: plt.get_cmap(name) for name in ('viridis', 'plasma')}
+_NORM = Normalize(0.0, 1.0)
+
+# Let Agg merge nearly collinear vertices of dense time-series lines and
+# render very long paths in chunks
+plt.rcParams.update({
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+})
+
+
+def _decimate(times, y, target=DECIMATE_TARGET):
+    """
+    Min/max-bucket decimation of a time series for plotting.
+
+    Splits the series into target/2 equal buckets and keeps the minimum and
+    maximum sample of each, so peaks stay visible while the line handed to
+    matplotlib has at most ~target vertices.
+    """
+    n = len(y)
+    if n <= target:
+        return times, y
+
+    k = n // (target // 2)
+    m = (n // k) * k
+    blocks = y[:m].reshape(-1, k)
+    base = np.arange(0, m, k)
+    idx = np.unique(np.concatenate([base + blocks.argmin(axis=1),
+                                    base + blocks.argmax(axis=1),
+                                    np.arange(m, n)]))
+    return times[idx], y[idx]
+
+
+def _sample_indices(n, max_points=SCATTER_MAX_POINTS):
+    """Sorted random subset of at most max_points indices (all of them if n is small)."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(0).choice(n, max_points, replace=False))
+
+
+def _parse_times(timestamps):
+    """
+    Parse an array of UTC timestamp strings into naive datetime64[us].
+
+    pandas' C parser also accepts 'Z' and '+00:00' suffixes; without pandas
+    a trailing 'Z' is stripped and NumPy parses the rest.
+    """
+    if PANDAS_AVAILABLE:
+        parsed = pd.to_datetime(timestamps, format='ISO8601', utc=True).tz_localize(None)
+        return parsed.to_numpy().astype('datetime64[us]')
+    return np.char.rstrip(timestamps, 'Z').astype('datetime64[us]')
+
+
+def _normalized_time(times):
+    """
+    Map sorted datetime64 timestamps onto [0, 1] with integer arithmetic.
+
+    A series with a single distinct timestamp maps to all zeros.
+    """
+    elapsed = (times - times[0]).astype(np.int64)
+    span = elapsed[-1]
+    return elapsed / span if span > 0 else np.zeros(len(times))
+
+
+def _time_rgba(time_normalized, cmap='plasma'):
+    """RGBA colors for normalized times from the shared colormap."""
+    return _CMAPS[cmap](_NORM(time_normalized))
+
+
+def _time_mappable(cmap='plasma'):
+    """Colorbar mappable for the [0, 1] time-progress scale."""
+    return ScalarMappable(norm=_NORM, cmap=_CMAPS[cmap])
+
+
+def _time_colored_line(points, time_normalized, cmap='plasma', **kwargs):
+    """
+    Single line collection through (N, 2) or (N, 3) points, each segment
+    colored by the normalized time at its start.
+    """
+    segments = np.stack([points[:-1], points[1:]], axis=1)
+    collection_cls = Line3DCollection if points.shape[1] == 3 else LineCollection
+    return collection_cls(segments, colors=_time_rgba(time_normalized[:-1], cmap), **kwargs)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _derive(x, y, z, mag, hor, dec, inc):
+        """Fill magnitude, horizontal component, declination and inclination (degrees) in one pass."""
+        for i in prange(x.size):
+            xi = x[i]
+            yi = y[i]
+            zi = z[i]
+            h2 = xi * xi + yi * yi
+            h = math.sqrt(h2)
+            mag[i] = math.sqrt(h2 + zi * zi)
+            hor[i] = h
+            dec[i] = math.degrees(math.atan2(yi, xi))
+            inc[i] = math.degrees(math.atan2(zi, h))
+elif NUMEXPR_AVAILABLE:
+    def _derive(x, y, z, mag, hor, dec, inc):
+        """Fill magnitude, horizontal component, declination and inclination (degrees) with numexpr."""
+        env = {'x': x, 'y': y, 'z': z, 'h': hor, 'deg': 180.0 / math.pi}
+        ne.evaluate('sqrt(x*x + y*y)', local_dict=env, out=hor)
+        ne.evaluate('sqrt(h*h + z*z)', local_dict=env, out=mag)
+        ne.evaluate('deg * arctan2(y, x)', local_dict=env, out=dec)
+        ne.evaluate('deg * arctan2(z, h)', local_dict=env, out=inc)
+else:
+    def _derive(x, y, z, mag, hor, dec, inc):
+        """Fill magnitude, horizontal component, declination and inclination (degrees), sharing x²+y²."""
+        h2 = x * x + y * y
+        np.sqrt(h2 + z * z, out=mag)
+        np.sqrt(h2, out=hor)
+        np.degrees(np.arctan2(y, x, out=dec), out=dec)
+        np.degrees(np.arctan2(z, hor, out=inc), out=inc)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _unwrap(a):
+        """
+        Single-pass phase unwrap for angles in (-pi, pi], where consecutive
+        samples never differ by more than one 2*pi turn.
+        """
+        out = np.empty_like(a)
+        if a.size == 0:
+            return out
+        out[0] = a[0]
+        correction = 0.0
+        prev = a[0]
+        for i in range(1, a.size):
+            delta = a[i] - prev
+            if delta > math.pi:
+                correction -= 2.0 * math.pi
+            elif delta < -math.pi:
+                correction += 2.0 * math.pi
+            out[i] = a[i] + correction
+            prev = a[i]
+        return out
+else:
+    _unwrap = np.unwrap
+
+
+class FluxData(dict):
+    """
+    Processed flux arrays, used like the plain dict process_data used to return.
+
+    Only times, x, y and z are stored up front. magnitude, horizontal,
+    declination and inclination are filled together by one _derive pass the
+    first time any of them is read, and the *_uT microtesla copies are scaled
+    on first read, so plots that never touch them (e.g. --plots vectors with
+    --no-stats) skip that work.
+    """
+
+    _DERIVED = ('magnitude', 'horizontal', 'declination', 'inclination')
+    _MICROTESLA = {
+        'x_uT': 'x',
+        'y_uT': 'y',
+        'z_uT': 'z',
+        'magnitude_uT': 'magnitude',
+        'horizontal_uT': 'horizontal',
+    }
+
+    def __missing__(self, key):
+        if key in self._DERIVED:
+            # Calculate derived quantities: magnitude, horizontal component,
+            # declination (angle from magnetic north) and inclination (dip angle)
+            x_array = self['x']
+            derived = {name: np.empty_like(x_array) for name in self._DERIVED}
+            _derive(x_array, self['y'], self['z'], derived['magnitude'], derived['horizontal'],
+                    derived['declination'], derived['inclination'])
+            self.update(derived)
+            return derived[key]
+        if key in self._MICROTESLA:
+            # Microtesla copy for display (1 T = 1e6 μT)
+            value = self[self._MICROTESLA[key]] * 1e6
+            self[key] = value
+            return value
+        raise KeyError(key)
+
 
 class MagneticFlux3DPlotter:
     """3D visualization utility for magnetic flux data."""
@@ -116,12 +346,12 @@ class MagneticFlux3DPlotter:
     def get_magnetic_flux_data(self, start_time, end_time):
         """Retrieve magnetic flux data for the specified time range."""
         try:
-            data = self.database.get_magnetic_flux_data_range(start_time, end_time)
-            if not data:
+            data = self.database.get_magnetic_flux_data_range(start_time, end_time, as_columns=True)
+            if len(data['x']) == 0:
                 print(f"No magnetic flux data found between {start_time} and {end_time}")
                 return None
 
-            print(f"Retrieved {len(data)} magnetic flux records")
+            print(f"Retrieved {len(data['x'])} magnetic flux records")
             return data
 
         except Exception as e:
@@ -130,95 +360,119 @@ class MagneticFlux3DPlotter:
 
     def process_data(self, raw_data):
         """Process raw database data into arrays for plotting."""
-        if not raw_data:
+        if raw_data is None:
+            return None
+        # Column dict from the database, or a structured array with the same fields
+        n_rows = len(raw_data['x']) if isinstance(raw_data, dict) else len(raw_data)
+        if n_rows == 0:
             return None
 
-        # Extract data into arrays
-        times = []
-        x_values = []
-        y_values = []
-        z_values = []
-
-        for row in raw_data:
-            # row format: (x, y, z, created_at)
-            x, y, z, timestamp_str = row
-
-            # Parse timestamp
-            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            times.append(timestamp)
-
-            # Store raw magnetic field components (LSb values from HMC5883L)
-            x_values.append(float(x))
-            y_values.append(float(y))
-            z_values.append(float(z))
+        # Raw magnetic field components (LSb values from HMC5883L), one column each
+        x_raw = raw_data['x']
+        y_raw = raw_data['y']
+        z_raw = raw_data['z']
 
-        # Convert to numpy arrays
-        times = np.array(times)
-        x_raw = np.array(x_values)
-        y_raw = np.array(y_values)
-        z_raw = np.array(z_values)
+        # Parse all timestamps at once (stored as UTC 'YYYY-MM-DD HH:MM:SS');
+        # they stay datetime64[us] through plotting, which matplotlib converts natively
+        times = _parse_times(raw_data['created_at'])
 
         # Apply calibration to convert raw LSb values to Tesla (NIST SP 330 SI units)
-        x_array = (x_raw * self.calibration_values['magnetic_flux_x_scale']) + self.calibration_values['magnetic_flux_x_offset']
-        y_array = (y_raw * self.calibration_values['magnetic_flux_y_scale']) + self.calibration_values['magnetic_flux_y_offset']
-        z_array = (z_raw * self.calibration_values['magnetic_flux_z_scale']) + self.calibration_values['magnetic_flux_z_offset']
+        # as one broadcast over a (3, N) block; each component row stays
+        # contiguous for _derive and the plots
+        cal = self.calibration_values
+        scale = np.array([cal[f'magnetic_flux_{axis}_scale'] for axis in 'xyz'])
+        offset = np.array([cal[f'magnetic_flux_{axis}_offset'] for axis in 'xyz'])
+        components = np.array([x_raw, y_raw, z_raw], dtype=np.float64)
+        components *= scale[:, None]
+        components += offset[:, None]
+        x_array, y_array, z_array = components
 
         print(f"Applied calibration to {len(x_array)} data points")
         print(f"Raw range: X=[{x_raw.min():.0f}, {x_raw.max():.0f}] LSb")
         print(f"Calibrated range: X=[{x_array.min():.2e}, {x_array.max():.2e}] Tesla")
 
-        # Calculate derived quantities
-        magnitude = np.sqrt(x_array**2 + y_array**2 + z_array**2)
+        return self._with_derived_quantities(times, x_array, y_array, z_array)
 
-        # Calculate magnetic declination (angle from magnetic north)
-        declination = np.degrees(np.arctan2(y_array, x_array))
+    @staticmethod
+    def _with_derived_quantities(times, x_array, y_array, z_array):
+        """Build the plotting dict from calibrated components (derived values are lazy)."""
+        return FluxData(times=times, x=x_array, y=y_array, z=z_array)
 
-        # Calculate magnetic inclination (dip angle)
-        horizontal_component = np.sqrt(x_array**2 + y_array**2)
-        inclination = np.degrees(np.arctan2(z_array, horizontal_component))
+    def _cache_path(self, start_time, end_time):
+        """
+        Cache file for a time range under CACHE_DIR.
 
-        return {
-            'times': times,
-            'x': x_array,
-            'y': y_array,
-            'z': z_array,
-            'magnitude': magnitude,
-            'declination': declination,
-            'inclination': inclination
-        }
+        The key covers the database, the rows currently in the range (count
+        and newest id, so new readings invalidate it), the requested range and
+        the calibration values.
+        """
+        signature = self.database.get_magnetic_flux_range_signature(start_time, end_time)
+        calibration = json.dumps(self.calibration_values, sort_keys=True, default=str)
+        key_source = f"{os.path.abspath(self.db_path)}-{signature}-{start_time}-{end_time}-{calibration}"
+        key = hashlib.blake2b(key_source.encode(), digest_size=8).hexdigest()
+        return os.path.join(CACHE_DIR, f"{key}.npz")
+
+    def load_data(self, start_time, end_time, use_cache=True):
+        """
+        Retrieve and calibrate magnetic flux data, reusing the on-disk cache.
+
+        Args:
+            start_time: Range start
+            end_time: Range end
+            use_cache: Read and write calibrated arrays under CACHE_DIR
+
+        Returns:
+            Processed data dict as from process_data(), or None if no data
+        """
+        # Whole-minute bounds, so runs within the same minute share a cache entry
+        start_time, end_time = cache_time_range(start_time, end_time)
+        cache_path = self._cache_path(start_time, end_time) if use_cache else None
+
+        cached = read_cache(cache_path)
+        if cached is not None:
+            try:
+                print(f"Loaded {len(cached['x'])} calibrated records from cache {cache_path}")
+                return self._with_derived_quantities(cached['times'], cached['x'], cached['y'], cached['z'])
+            except KeyError as e:
+                print(f"Ignoring unreadable cache file {cache_path}: {e}")
+
+        raw_data = self.get_magnetic_flux_data(start_time, end_time)
+        if raw_data is None:
+            return None
+        data = self.process_data(raw_data)
+
+        if data and cache_path:
+            write_cache(cache_path, {'times': data['times'], 'x': data['x'], 'y': data['y'], 'z': data['z']})
+
+        return data
 
     def create_3d_vector_plot(self, data, title="Magnetic Flux 3D Vectors"):
         """Create 3D vector field plot."""
         fig = plt.figure(figsize=(12, 8))
         ax = fig.add_subplot(111, projection='3d')
 
-        # Convert Tesla to microtesla for better readability (1 T = 1e6 μT)
-        x_microtesla = data['x'] * 1e6
-        y_microtesla = data['y'] * 1e6
-        z_microtesla = data['z'] * 1e6
+        # Pick evenly spaced samples first so only those points are converted
+        n_points = len(data['x'])
+        indices = np.unique(np.linspace(0, n_points - 1, VECTOR_MAX_ARROWS, dtype=np.int64))
 
-        # Use time as the third dimension for vector positions
-        time_numeric = mdates.date2num(data['times'])
-        time_normalized = (time_numeric - time_numeric.min()) / (time_numeric.max() - time_numeric.min())
+        # Microtesla for better readability
+        x_microtesla = data['x_uT'][indices]
+        y_microtesla = data['y_uT'][indices]
+        z_microtesla = data['z_uT'][indices]
 
-        # Sample data for cleaner visualization (every Nth point)
-        n_points = len(data['x'])
-        step = max(1, n_points // 50)  # Show max 50 vectors
-        indices = range(0, n_points, step)
+        # Use time as the third dimension for vector positions. The samples
+        # include both endpoints, so normalizing over them spans the full range.
+        time_normalized = _normalized_time(data['times'][indices])
 
         # Create 3D quiver plot - use simple quiver without color argument
-        quiver = ax.quiver(x_microtesla[indices],
-                          y_microtesla[indices],
-                          z_microtesla[indices],
-                          x_microtesla[indices],
-                          y_microtesla[indices],
-                          z_microtesla[indices],
+        quiver = ax.quiver(x_microtesla, y_microtesla, z_microtesla,
+                          x_microtesla, y_microtesla, z_microtesla,
                           length=0.1, normalize=True,
                           color='blue', alpha=0.6)
 
         # Add scatter plot with time coloring
-        scatter = ax.scatter(x_microtesla[indices], y_microtesla[indices], z_microtesla[indices],
-                           c=time_normalized[indices], cmap='viridis', s=30, alpha=0.8)
+        scatter = ax.scatter(x_microtesla, y_microtesla, z_microtesla,
+                           c=_time_rgba(time_normalized, 'viridis'), s=30, alpha=0.8)
 
         ax.set_xlabel('X Component (μT)')
         ax.set_ylabel('Y Component (μT)')
@@ -226,40 +480,72 @@ class MagneticFlux3DPlotter:
         ax.set_title(f"{title} (NIST SP 330 Calibrated)")
 
         # Add colorbar for time
-        cbar = plt.colorbar(scatter, ax=ax, shrink=0.5, aspect=5)
+        cbar = plt.colorbar(_time_mappable('viridis'), ax=ax, shrink=0.5, aspect=5)
         cbar.set_label('Time (normalized)')
 
         return fig
 
-    def create_magnitude_time_plot(self, data, title="Magnetic Flux Magnitude vs Time"):
-        """Create magnitude vs time plot."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+    def create_magnitude_time_plot(self, data, title="Magnetic Flux Magnitude vs Time", fig=None, artists=None):
+        """
+        Create magnitude vs time plot.
+
+        Args:
+            data: Processed data from process_data()
+            title: Plot title
+            fig: Figure returned by an earlier call, to redraw in place
+            artists: Dict of artist handles. An empty dict is filled on the
+                first call; passing it back together with fig updates those
+                artists with set_data instead of building a new figure.
+
+        Returns:
+            Matplotlib figure
+        """
+        # Microtesla for better readability
+        magnitude_microtesla = data['magnitude_uT']
+        x_microtesla = data['x_uT']
+        y_microtesla = data['y_uT']
+        z_microtesla = data['z_uT']
 
-        # Convert Tesla to microtesla for better readability (1 T = 1e6 μT)
-        magnitude_microtesla = data['magnitude'] * 1e6
-        x_microtesla = data['x'] * 1e6
-        y_microtesla = data['y'] * 1e6
-        z_microtesla = data['z'] * 1e6
+        # Statistics
+        mean_mag = np.mean(magnitude_microtesla)
+        std_mag = np.std(magnitude_microtesla)
+        span = data['times'][[0, -1]]
+
+        if fig is not None and artists:
+            ax1, ax2 = artists['mag_line'].axes, artists['comp_x'].axes
+            artists['mag_line'].set_data(*_decimate(data['times'], magnitude_microtesla))
+            artists['mean_line'].set_ydata([mean_mag, mean_mag])
+            artists['mean_line'].set_label(f'Mean: {mean_mag:.2f} μT')
+            artists['std_band'].remove()
+            artists['std_band'] = ax1.fill_between(span, mean_mag - std_mag, mean_mag + std_mag,
+                                                   alpha=0.2, color='red', label=f'±1σ: {std_mag:.2f} μT')
+            for key, values in (('comp_x', x_microtesla), ('comp_y', y_microtesla), ('comp_z', z_microtesla)):
+                artists[key].set_data(*_decimate(data['times'], values))
+            ax1.set_title(f"{title} (NIST SP 330 Calibrated)")
+            ax1.legend()
+            for ax in (ax1, ax2):
+                ax.relim()
+                ax.autoscale_view()
+            return fig
+
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
 
         # Magnitude plot
-        ax1.plot(data['times'], magnitude_microtesla, 'b-', linewidth=1, alpha=0.8)
+        mag_line, = ax1.plot(*_decimate(data['times'], magnitude_microtesla), 'b-', linewidth=1, alpha=0.8)
         ax1.set_ylabel('Magnitude (μT)')
         ax1.set_title(f"{title} (NIST SP 330 Calibrated)")
         ax1.grid(True, alpha=0.3)
 
-        # Statistics
-        mean_mag = np.mean(magnitude_microtesla)
-        std_mag = np.std(magnitude_microtesla)
-        ax1.axhline(mean_mag, color='r', linestyle='--', alpha=0.7,
-                   label=f'Mean: {mean_mag:.2f} μT')
-        ax1.fill_between(data['times'], mean_mag - std_mag, mean_mag + std_mag,
-                        alpha=0.2, color='red', label=f'±1σ: {std_mag:.2f} μT')
+        mean_line = ax1.axhline(mean_mag, color='r', linestyle='--', alpha=0.7,
+                               label=f'Mean: {mean_mag:.2f} μT')
+        std_band = ax1.fill_between(span, mean_mag - std_mag, mean_mag + std_mag,
+                                    alpha=0.2, color='red', label=f'±1σ: {std_mag:.2f} μT')
         ax1.legend()
 
         # Components plot
-        ax2.plot(data['times'], x_microtesla, 'r-', label='X Component', alpha=0.7)
-        ax2.plot(data['times'], y_microtesla, 'g-', label='Y Component', alpha=0.7)
-        ax2.plot(data['times'], z_microtesla, 'b-', label='Z Component', alpha=0.7)
+        comp_x, = ax2.plot(*_decimate(data['times'], x_microtesla), 'r-', label='X Component', alpha=0.7)
+        comp_y, = ax2.plot(*_decimate(data['times'], y_microtesla), 'g-', label='Y Component', alpha=0.7)
+        comp_z, = ax2.plot(*_decimate(data['times'], z_microtesla), 'b-', label='Z Component', alpha=0.7)
         ax2.set_xlabel('Time')
         ax2.set_ylabel('Component Value (μT)')
         ax2.set_title('Individual Components')
@@ -272,30 +558,63 @@ class MagneticFlux3DPlotter:
         plt.xticks(rotation=45)
 
         plt.tight_layout()
+
+        if artists is not None:
+            artists.update(mag_line=mag_line, mean_line=mean_line, std_band=std_band,
+                           comp_x=comp_x, comp_y=comp_y, comp_z=comp_z)
         return fig
 
-    def create_direction_analysis_plot(self, data, title="Magnetic Field Direction Analysis"):
-        """Create declination and inclination analysis plots."""
+    def create_direction_analysis_plot(self, data, title="Magnetic Field Direction Analysis", fig=None, artists=None):
+        """
+        Create declination and inclination analysis plots.
+
+        Args:
+            data: Processed data from process_data()
+            title: Plot title
+            fig: Figure returned by an earlier call, to redraw in place
+            artists: Dict of artist handles, filled on the first call and
+                updated with set_data when passed back together with fig
+
+        Returns:
+            Matplotlib figure
+        """
+        series = {
+            'declination': data['declination'],
+            'inclination': data['inclination'],
+            'horizontal': data['horizontal_uT'],
+            'vertical': np.abs(data['z_uT']),
+        }
+
+        if fig is not None and artists:
+            for key, values in series.items():
+                artists[key].set_data(*_decimate(data['times'], values))
+            for ax in fig.axes:
+                ax.relim()
+                ax.autoscale_view()
+            return fig
+
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+        lines = {}
 
         # Declination (horizontal angle)
-        ax1.plot(data['times'], data['declination'], 'purple', linewidth=1)
+        lines['declination'], = ax1.plot(*_decimate(data['times'], series['declination']), 'purple', linewidth=1)
         ax1.set_ylabel('Declination (°)')
         ax1.set_title('Magnetic Declination (Angle from North)')
         ax1.grid(True, alpha=0.3)
         ax1.axhline(0, color='k', linestyle='-', alpha=0.3)
 
         # Inclination (dip angle)
-        ax2.plot(data['times'], data['inclination'], 'orange', linewidth=1)
+        lines['inclination'], = ax2.plot(*_decimate(data['times'], series['inclination']), 'orange', linewidth=1)
         ax2.set_ylabel('Inclination (°)')
         ax2.set_title('Magnetic Inclination (Dip Angle)')
         ax2.grid(True, alpha=0.3)
         ax2.axhline(0, color='k', linestyle='-', alpha=0.3)
 
         # Horizontal component
-        horizontal = np.sqrt(data['x']**2 + data['y']**2)
-        ax3.plot(data['times'], horizontal, 'cyan', label='Horizontal', linewidth=1)
-        ax3.plot(data['times'], np.abs(data['z']), 'brown', label='Vertical (|Z|)', linewidth=1)
+        lines['horizontal'], = ax3.plot(*_decimate(data['times'], series['horizontal']), 'cyan',
+                                        label='Horizontal', linewidth=1)
+        lines['vertical'], = ax3.plot(*_decimate(data['times'], series['vertical']), 'brown',
+                                      label='Vertical (|Z|)', linewidth=1)
         ax3.set_xlabel('Time')
         ax3.set_ylabel('Component Magnitude (μT)')
         ax3.set_title('Horizontal vs Vertical Components')
@@ -308,6 +627,9 @@ class MagneticFlux3DPlotter:
         plt.xticks(rotation=45)
 
         plt.tight_layout()
+
+        if artists is not None:
+            artists.update(lines)
         return fig
 
     def create_3d_trajectory_plot(self, data, title="Magnetic Field Trajectory"):
@@ -316,15 +638,14 @@ class MagneticFlux3DPlotter:
         ax = fig.add_subplot(111, projection='3d')
 
         # Create trajectory line
-        time_numeric = mdates.date2num(data['times'])
-        time_normalized = (time_numeric - time_numeric.min()) / (time_numeric.max() - time_numeric.min())
-
-        # Plot trajectory
-        ax.plot(data['x'], data['y'], data['z'], 'b-', alpha=0.6, linewidth=1)
+        time_normalized = _normalized_time(data['times'])
 
-        # Color points by time
-        scatter = ax.scatter(data['x'], data['y'], data['z'],
-                           c=time_normalized, cmap='plasma', s=20, alpha=0.8)
+        # Plot trajectory as one time-colored line through a capped subsample
+        sample = _sample_indices(len(data['x']))
+        points = np.column_stack([data['x'][sample], data['y'][sample], data['z'][sample]])
+        trajectory = _time_colored_line(points, time_normalized[sample], linewidth=1.5, alpha=0.8)
+        ax.add_collection3d(trajectory)
+        ax.auto_scale_xyz(points[:, 0], points[:, 1], points[:, 2])
 
         # Mark start and end points
         ax.scatter(data['x'][0], data['y'][0], data['z'][0],
@@ -339,11 +660,43 @@ class MagneticFlux3DPlotter:
         ax.legend()
 
         # Add colorbar
-        cbar = plt.colorbar(scatter, ax=ax, shrink=0.5, aspect=5)
+        cbar = plt.colorbar(_time_mappable(), ax=ax, shrink=0.5, aspect=5)
         cbar.set_label('Time Progress')
 
         return fig
 
+    def create_3d_trajectory_plot_gpu(self, data, title="Magnetic Field Trajectory"):
+        """
+        Create an interactive OpenGL 3D trajectory with vispy.
+
+        The whole series is uploaded once as a single line strip with
+        per-vertex time colors, so rotating does not re-project vertices on
+        the CPU the way mplot3d does.
+
+        Args:
+            data: Processed data from process_data()
+            title: Window title
+
+        Returns:
+            vispy SceneCanvas (not yet shown), or a matplotlib figure from
+            create_3d_trajectory_plot() when vispy is not installed
+        """
+        if not VISPY_AVAILABLE:
+            print("Warning: vispy not available, falling back to matplotlib")
+            return self.create_3d_trajectory_plot(data, title)
+
+        canvas = scene.SceneCanvas(title=title, keys='interactive', size=(1200, 800),
+                                   bgcolor='white', show=False)
+        view = canvas.central_widget.add_view()
+        view.camera = 'turntable'
+
+        positions = np.column_stack([data['x_uT'], data['y_uT'], data['z_uT']]).astype(np.float32)
+        colors = _time_rgba(_normalized_time(data['times'])).astype(np.float32)
+        scene.visuals.Line(pos=positions, color=colors, method='gl', connect='strip', parent=view.scene)
+        view.camera.set_range()
+
+        return canvas
+
     def create_2d_polar_plot(self, data, title="Magnetic Field XY Plane - Polar View"):
         """Create 2D polar plot showing magnitude and direction in XY plane."""
         fig = plt.figure(figsize=(12, 10))
@@ -351,24 +704,25 @@ class MagneticFlux3DPlotter:
         # Create polar subplot
         ax_polar = fig.add_subplot(221, projection='polar')
 
-        # Convert Tesla to microtesla for better readability (1 T = 1e6 μT)
-        x_microtesla = data['x'] * 1e6
-        y_microtesla = data['y'] * 1e6
+        # Microtesla for better readability
+        x_microtesla = data['x_uT']
+        y_microtesla = data['y_uT']
 
         # Calculate XY plane magnitude and angle
-        xy_magnitude = np.sqrt(x_microtesla**2 + y_microtesla**2)
+        xy_magnitude = data['horizontal_uT']
         xy_angle = np.arctan2(y_microtesla, x_microtesla)  # Angle in radians
 
         # Create time-based coloring
-        time_numeric = mdates.date2num(data['times'])
-        time_normalized = (time_numeric - time_numeric.min()) / (time_numeric.max() - time_numeric.min())
+        time_normalized = _normalized_time(data['times'])
 
-        # Polar scatter plot
-        scatter = ax_polar.scatter(xy_angle, xy_magnitude, c=time_normalized,
-                                 cmap='plasma', s=20, alpha=0.7)
+        # Scatter and trajectory views draw a capped, time-ordered subsample
+        sample = _sample_indices(len(xy_angle))
 
-        # Add trajectory line
-        ax_polar.plot(xy_angle, xy_magnitude, 'b-', alpha=0.3, linewidth=0.5)
+        # Polar trajectory, colored by time
+        polar_line = _time_colored_line(np.column_stack([xy_angle[sample], xy_magnitude[sample]]),
+                                        time_normalized[sample], linewidth=1.5, alpha=0.7)
+        ax_polar.add_collection(polar_line)
+        ax_polar.autoscale_view()
 
         ax_polar.set_title('XY Plane Polar View\n(Horizontal Magnetic Field - NIST SP 330)',
                           fontsize=12, pad=20)
@@ -377,14 +731,14 @@ class MagneticFlux3DPlotter:
         ax_polar.set_theta_direction(-1)  # Clockwise
 
         # Add colorbar
-        cbar = plt.colorbar(scatter, ax=ax_polar, shrink=0.8, pad=0.1)
+        cbar = plt.colorbar(_time_mappable(), ax=ax_polar, shrink=0.8, pad=0.1)
         cbar.set_label('Time Progress')
 
         # Create XY cartesian plot
         ax_xy = fig.add_subplot(222)
-        scatter_xy = ax_xy.scatter(data['x'], data['y'], c=time_normalized,
-                                  cmap='plasma', s=20, alpha=0.7)
-        ax_xy.plot(data['x'], data['y'], 'b-', alpha=0.3, linewidth=0.5)
+        ax_xy.add_collection(_time_colored_line(np.column_stack([data['x'][sample], data['y'][sample]]),
+                                                time_normalized[sample], linewidth=1.5, alpha=0.7))
+        ax_xy.autoscale_view()
         ax_xy.set_xlabel('X Component (μT)')
         ax_xy.set_ylabel('Y Component (μT)')
         ax_xy.set_title('XY Cartesian View')
@@ -397,9 +751,9 @@ class MagneticFlux3DPlotter:
 
         # Magnitude vs Time plot
         ax_mag = fig.add_subplot(223)
-        ax_mag.plot(data['times'], xy_magnitude, 'purple', linewidth=1, label='XY Magnitude')
-        ax_mag.plot(data['times'], np.abs(data['z']), 'brown', linewidth=1, label='Z Magnitude')
-        ax_mag.plot(data['times'], data['magnitude'], 'black', linewidth=1, label='Total Magnitude')
+        ax_mag.plot(*_decimate(data['times'], xy_magnitude), 'purple', linewidth=1, label='XY Magnitude')
+        ax_mag.plot(*_decimate(data['times'], np.abs(data['z'])), 'brown', linewidth=1, label='Z Magnitude')
+        ax_mag.plot(*_decimate(data['times'], data['magnitude']), 'black', linewidth=1, label='Total Magnitude')
         ax_mag.set_xlabel('Time')
         ax_mag.set_ylabel('Magnitude (μT)')
         ax_mag.set_title('Magnitude Components vs Time')
@@ -415,9 +769,9 @@ class MagneticFlux3DPlotter:
         ax_angle = fig.add_subplot(224)
         angle_degrees = np.degrees(xy_angle)
         # Unwrap angles to avoid discontinuities
-        angle_unwrapped = np.degrees(np.unwrap(xy_angle))
-        ax_angle.plot(data['times'], angle_degrees, 'green', linewidth=1, alpha=0.7, label='Raw Angle')
-        ax_angle.plot(data['times'], angle_unwrapped, 'darkgreen', linewidth=1, label='Unwrapped Angle')
+        angle_unwrapped = np.degrees(_unwrap(xy_angle))
+        ax_angle.plot(*_decimate(data['times'], angle_degrees), 'green', linewidth=1, alpha=0.7, label='Raw Angle')
+        ax_angle.plot(*_decimate(data['times'], angle_unwrapped), 'darkgreen', linewidth=1, label='Unwrapped Angle')
         ax_angle.set_xlabel('Time')
         ax_angle.set_ylabel('XY Angle (degrees)')
         ax_angle.set_title('XY Plane Angle vs Time')
@@ -440,29 +794,53 @@ class MagneticFlux3DPlotter:
         print("MAGNETIC FLUX DATA STATISTICS")
         print("="*60)
 
-        print(f"Time Range: {data['times'][0]} to {data['times'][-1]}")
-        print(f"Duration: {data['times'][-1] - data['times'][0]}")
+        start, end = data['times'][[0, -1]].astype(datetime)
+        print(f"Time Range: {start} to {end}")
+        print(f"Duration: {end - start}")
         print(f"Number of samples: {len(data['times'])}")
 
+        # One (4, N) block in μT so each statistic is a single reduction
+        stats_arr = np.stack([data['x_uT'], data['y_uT'], data['z_uT'], data['magnitude_uT']])
+        means = stats_arr.mean(axis=1)
+        stds = stats_arr.std(axis=1)
+        mins = stats_arr.min(axis=1)
+        maxs = stats_arr.max(axis=1)
+
         print(f"\nMagnetic Field Components (μT):")
-        print(f"  X: {np.mean(data['x'])*1e6:.2f} ± {np.std(data['x'])*1e6:.2f} (range: {np.min(data['x'])*1e6:.2f} to {np.max(data['x'])*1e6:.2f})")
-        print(f"  Y: {np.mean(data['y'])*1e6:.2f} ± {np.std(data['y'])*1e6:.2f} (range: {np.min(data['y'])*1e6:.2f} to {np.max(data['y'])*1e6:.2f})")
-        print(f"  Z: {np.mean(data['z'])*1e6:.2f} ± {np.std(data['z'])*1e6:.2f} (range: {np.min(data['z'])*1e6:.2f} to {np.max(data['z'])*1e6:.2f})")
+        for i, name in enumerate('XYZ'):
+            print(f"  {name}: {means[i]:.2f} ± {stds[i]:.2f} (range: {mins[i]:.2f} to {maxs[i]:.2f})")
 
         print(f"\nMagnetic Field Magnitude:")
-        print(f"  Mean: {np.mean(data['magnitude'])*1e6:.2f} μT")
-        print(f"  Std Dev: {np.std(data['magnitude'])*1e6:.2f} μT")
-        print(f"  Range: {np.min(data['magnitude'])*1e6:.2f} to {np.max(data['magnitude'])*1e6:.2f} μT")
+        print(f"  Mean: {means[3]:.2f} μT")
+        print(f"  Std Dev: {stds[3]:.2f} μT")
+        print(f"  Range: {mins[3]:.2f} to {maxs[3]:.2f} μT")
 
+        angles = np.stack([data['declination'], data['inclination']])
+        angle_means = angles.mean(axis=1)
+        angle_stds = angles.std(axis=1)
         print(f"\nMagnetic Field Direction:")
-        print(f"  Declination: {np.mean(data['declination']):.1f}° ± {np.std(data['declination']):.1f}°")
-        print(f"  Inclination: {np.mean(data['inclination']):.1f}° ± {np.std(data['inclination']):.1f}°")
+        print(f"  Declination: {angle_means[0]:.1f}° ± {angle_stds[0]:.1f}°")
+        print(f"  Inclination: {angle_means[1]:.1f}° ± {angle_stds[1]:.1f}°")
 
         # Earth's magnetic field context
         earth_field_typical = 50  # μT (typical Earth's field strength)
         print(f"\nEarth's Magnetic Field Context:")
         print(f"  Typical Earth field: ~{earth_field_typical} μT")
-        print(f"  Measured field ratio: {np.mean(data['magnitude'])*1e6/earth_field_typical:.2f}x typical")
+        print(f"  Measured field ratio: {means[3]/earth_field_typical:.2f}x typical")
+
+
+def save_figures(figures, output_dir, fmt):
+    """
+    Save (filename, figure) pairs, rendering them concurrently when possible.
+
+    Args:
+        figures: List of (filename, matplotlib figure) pairs
+        output_dir: Directory to write into
+        fmt: File extension/format
+    """
+    jobs = [(fig, os.path.join(output_dir, f"{filename}.{fmt}")) for filename, fig in figures]
+    for filepath in save_figures_parallel(jobs, dpi=300):
+        print(f"Saved: {filepath}")
 
 
 def parse_arguments():
@@ -501,10 +879,15 @@ Examples:
                        help='Output directory for saved plots (default: current)')
     parser.add_argument('--format', choices=['png', 'pdf', 'svg'], default='png',
                        help='Output format for saved plots (default: png)')
+    parser.add_argument('--backend', choices=['matplotlib', 'vispy'], default='matplotlib',
+                       help='Renderer for the interactive 3D trajectory (default: matplotlib; '
+                            'vispy needs the optional vispy package and is not used with --save)')
 
     # Display options
     parser.add_argument('--no-stats', action='store_true',
                        help='Skip printing statistics')
+    parser.add_argument('--no-cache', action='store_true',
+                       help=f'Do not read or write calibrated data under {CACHE_DIR}')
     parser.add_argument('--plots', nargs='+',
                        choices=['vectors', 'magnitude', 'direction', 'trajectory', 'polar', 'all'],
                        default=['all'],
@@ -538,15 +921,10 @@ def main():
 
     print(f"Retrieving data from {start_time} to {end_time}")
 
-    # Get and process data
-    raw_data = plotter.get_magnetic_flux_data(start_time, end_time)
-    if not raw_data:
-        print("No data available for the specified time range.")
-        return
-
-    data = plotter.process_data(raw_data)
+    # Get and process data (or reuse calibrated arrays from an earlier run)
+    data = plotter.load_data(start_time, end_time, use_cache=not args.no_cache)
     if not data:
-        print("Failed to process data.")
+        print("No data available for the specified time range.")
         return
 
     # Print statistics
@@ -558,6 +936,7 @@ def main():
 
     # Create plots
     figures = []
+    gpu_canvases = []
 
     if 'vectors' in plot_types:
         print("\nCreating 3D vector plot...")
@@ -575,9 +954,16 @@ def main():
         figures.append(('magnetic_flux_direction', fig))
 
     if 'trajectory' in plot_types:
-        print("Creating 3D trajectory plot...")
-        fig = plotter.create_3d_trajectory_plot(data)
-        figures.append(('magnetic_flux_trajectory', fig))
+        if args.backend == 'vispy' and VISPY_AVAILABLE and not args.save:
+            print("Creating 3D trajectory plot (vispy)...")
+            gpu_canvases.append(plotter.create_3d_trajectory_plot_gpu(data))
+        else:
+            if args.backend == 'vispy':
+                reason = "saving to files" if args.save else "vispy not available"
+                print(f"Using matplotlib for the trajectory plot ({reason})")
+            print("Creating 3D trajectory plot...")
+            fig = plotter.create_3d_trajectory_plot(data)
+            figures.append(('magnetic_flux_trajectory', fig))
 
     if 'polar' in plot_types:
         print("Creating 2D polar plot...")
@@ -589,15 +975,18 @@ def main():
         # Create output directory if it doesn't exist
         os.makedirs(args.output_dir, exist_ok=True)
 
-        for filename, fig in figures:
-            filepath = os.path.join(args.output_dir, f"{filename}.{args.format}")
-            fig.savefig(filepath, dpi=300, bbox_inches='tight')
-            print(f"Saved: {filepath}")
+        save_figures(figures, args.output_dir, args.format)
 
         print(f"\nAll plots saved to {args.output_dir}/")
     else:
         print("\nDisplaying plots... Close plot windows to exit.")
-        plt.show()
+        if figures:
+            plt.show()
+        # vispy runs its own event loop once the matplotlib windows are closed
+        for canvas in gpu_canvases:
+            canvas.show()
+        if gpu_canvases:
+            gpu_canvases[0].app.run()
 
 
 if __name__ == "__main__":
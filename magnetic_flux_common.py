@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the magnetic flux plotting utilities.
+
+Used by magnetic_flux_3d_plotter.py and magnetic_flux_comparison_plotter.py:
+- CACHE_DIR and read_cache/write_cache: on-disk cache of loaded/calibrated
+  arrays (.npz files), pruned by count and age
+- save_figures_parallel: render matplotlib figures to disk in a process pool
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+# Loaded and calibrated arrays from earlier runs, as .npz files keyed by
+# database state, time range and calibration
+CACHE_DIR = os.path.expanduser('~/.cache/mag_flux')
+
+# Entries beyond the CACHE_MAX_FILES most recently used, or unused for
+# CACHE_MAX_AGE seconds, are deleted whenever a new entry is written
+CACHE_MAX_FILES = 32
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+def cache_time_range(start_time, end_time):
+    """
+    Widen a time range to whole minutes: start rounded down, end rounded up.
+
+    Relative ranges (--hours, --days) end at datetime.now(); without rounding
+    every run would have a different cache key.
+
+    Args:
+        start_time: Range start
+        end_time: Range end
+
+    Returns:
+        Tuple of (start, end) on minute boundaries covering the original range
+    """
+    start = start_time.replace(second=0, microsecond=0)
+    end = end_time.replace(second=0, microsecond=0)
+    if end != end_time:
+        end += timedelta(minutes=1)
+    return start, end
+
+
+def read_cache(cache_path):
+    """Arrays stored at cache_path as a dict, or None if absent or unreadable."""
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path) as cached:
+            arrays = {key: cached[key] for key in cached.files}
+        # Mark as recently used so pruning keeps it
+        os.utime(cache_path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache file {cache_path}: {e}")
+        return None
+    return arrays
+
+
+def write_cache(cache_path, arrays):
+    """Atomically store a dict of arrays at cache_path (skipping None values), then prune."""
+    if not cache_path:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + '.tmp.npz'
+        np.savez(tmp_path, **{key: value for key, value in arrays.items() if value is not None})
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write cache file {cache_path}: {e}")
+    prune_cache()
+
+
+def prune_cache(max_files=CACHE_MAX_FILES, max_age=CACHE_MAX_AGE):
+    """
+    Delete cache entries beyond the max_files most recently used or older than max_age.
+
+    Args:
+        max_files: Number of .npz files to keep
+        max_age: Seconds since last use after which a file is deleted
+    """
+    try:
+        entries = [entry for entry in os.scandir(CACHE_DIR)
+                   if entry.name.endswith('.npz') and entry.is_file()]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+
+    cutoff = time.time() - max_age
+    for i, entry in enumerate(entries):
+        try:
+            if i >= max_files or entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _save_figure(fig, filepath, dpi):
+    """Render one figure to disk; runs in a worker process when saving in parallel."""
+    fig.savefig(filepath, dpi=dpi, bbox_inches='tight')
+    return filepath
+
+
+def save_figures_parallel(jobs, dpi):
+    """
+    Save (figure, filepath) pairs, rendering them concurrently when possible.
+
+    Rasterizing and encoding are independent per figure, so figures are
+    pickled to a process pool; pyplot is not thread-safe, so threads are not
+    used. Any figure that fails there (e.g. cannot be pickled) is saved in
+    this process instead.
+
+    Args:
+        jobs: List of (matplotlib figure, output file path) pairs
+        dpi: Output resolution
+
+    Yields:
+        Each file path once its figure has been written, in job order
+    """
+    workers = min(len(jobs), os.cpu_count() or 1)
+
+    if workers < 2:
+        for fig, filepath in jobs:
+            yield _save_figure(fig, filepath, dpi)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_save_figure, fig, filepath, dpi) for fig, filepath in jobs]
+        for (fig, filepath), future in zip(jobs, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"Parallel save failed for {filepath} ({e}), saving directly")
+                yield _save_figure(fig, filepath, dpi)
@@ -33,22 +33,302 @@ Examples:
 import argparse
 import sqlite3
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import hashlib
+import math
 import os
+from pathlib import Path
 import json
 from scipy import stats
 import sys
 
+# Add project directory to path for the shared plotting helpers
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from magnetic_flux_common import CACHE_DIR, cache_time_range, read_cache, write_cache, save_figures_parallel
+
+# Optional threaded, fused evaluation of the calibration and magnitude expressions
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+# Optional JIT compilation of the comparison statistics kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMEXPR_AVAILABLE:
+    def _calibrate(raw, scale, offset):
+        """Convert raw LSb values to Tesla in one fused pass."""
+        return ne.evaluate('raw * scale + offset', local_dict={'raw': raw, 'scale': scale, 'offset': offset})
+
+    def _magnitude(x, y, z):
+        """Vector magnitude in one fused pass."""
+        return ne.evaluate('sqrt(x*x + y*y + z*z)', local_dict={'x': x, 'y': y, 'z': z})
+else:
+    def _calibrate(raw, scale, offset):
+        """Convert raw LSb values to Tesla with a single output buffer."""
+        out = raw * scale
+        out += offset
+        return out
+
+    def _magnitude(x, y, z):
+        """Vector magnitude with a single scratch buffer."""
+        out = x * x
+        out += y * y
+        out += z * z
+        return np.sqrt(out, out=out)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pair_stats(local, usgs):
+        """
+        Summary statistics of two aligned series, fused into two passes
+        (sums, then centred moments) with no temporary arrays.
+
+        Returns:
+            (local_mean, usgs_mean, local_std, usgs_std, diff_mean, diff_std,
+            diff_rms, correlation)
+        """
+        n = local.size
+        sum_l = 0.0
+        sum_u = 0.0
+        for i in prange(n):
+            sum_l += local[i]
+            sum_u += usgs[i]
+        mean_l = sum_l / n
+        mean_u = sum_u / n
+
+        ss_l = 0.0
+        ss_u = 0.0
+        ss_d = 0.0
+        cross = 0.0
+        for i in prange(n):
+            dl = local[i] - mean_l
+            du = usgs[i] - mean_u
+            ss_l += dl * dl
+            ss_u += du * du
+            ss_d += (dl - du) * (dl - du)
+            cross += dl * du
+
+        mean_d = mean_l - mean_u
+        if n < 2:
+            r = 0.0
+        elif ss_l == 0.0 or ss_u == 0.0:
+            r = np.nan
+        else:
+            r = cross / math.sqrt(ss_l * ss_u)
+        return (mean_l, mean_u, math.sqrt(ss_l / n), math.sqrt(ss_u / n),
+                mean_d, math.sqrt(ss_d / n), math.sqrt(ss_d / n + mean_d * mean_d), r)
+else:
+    def _stats_from_moments(n, mean_l, mean_u, ss_l, ss_u, ss_d, cross):
+        """_pair_stats result tuple from means and centred sums of squares/products."""
+        mean_d = mean_l - mean_u
+        if n < 2:
+            r = 0.0
+        elif ss_l == 0.0 or ss_u == 0.0:
+            r = np.nan
+        else:
+            r = cross / math.sqrt(ss_l * ss_u)
+        return (mean_l, mean_u, math.sqrt(ss_l / n), math.sqrt(ss_u / n),
+                mean_d, math.sqrt(ss_d / n), math.sqrt(ss_d / n + mean_d * mean_d), r)
+
+    if NUMEXPR_AVAILABLE:
+        def _pair_stats(local, usgs):
+            """
+            Summary statistics of two aligned series from numexpr sum()
+            reductions, each one fused pass with no temporary arrays.
+
+            Returns:
+                (local_mean, usgs_mean, local_std, usgs_std, diff_mean, diff_std,
+                diff_rms, correlation)
+            """
+            n = local.size
+            env = {'l': local, 'u': usgs}
+            env['ml'] = float(ne.evaluate('sum(l)', local_dict=env)) / n
+            env['mu'] = float(ne.evaluate('sum(u)', local_dict=env)) / n
+            ss_l = float(ne.evaluate('sum((l - ml) * (l - ml))', local_dict=env))
+            ss_u = float(ne.evaluate('sum((u - mu) * (u - mu))', local_dict=env))
+            ss_d = float(ne.evaluate('sum((l - ml - u + mu) * (l - ml - u + mu))', local_dict=env))
+            cross = float(ne.evaluate('sum((l - ml) * (u - mu))', local_dict=env))
+            return _stats_from_moments(n, env['ml'], env['mu'], ss_l, ss_u, ss_d, cross)
+    else:
+        def _pair_stats(local, usgs):
+            """
+            Summary statistics of two aligned series from shared centred copies.
+
+            Returns:
+                (local_mean, usgs_mean, local_std, usgs_std, diff_mean, diff_std,
+                diff_rms, correlation)
+            """
+            n = local.size
+            mean_l = local.mean()
+            mean_u = usgs.mean()
+            dl = local - mean_l
+            du = usgs - mean_u
+            ss_l = dl @ dl
+            ss_u = du @ du
+            cross = dl @ du
+            dl -= du
+            return _stats_from_moments(n, mean_l, mean_u, ss_l, ss_u, dl @ dl, cross)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _minmax(a):
+        """Minimum and maximum of a non-empty array in one pass."""
+        lo = a[0]
+        hi = a[0]
+        for i in range(1, a.size):
+            v = a[i]
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        return lo, hi
+else:
+    def _minmax(a):
+        """Minimum and maximum of a non-empty array."""
+        return a.min(), a.max()
+
+
+def _parse_timestamps(column):
+    """Parse a column of SQLite timestamp strings into naive UTC datetime64[ns] values."""
+    return pd.to_datetime(column, format='ISO8601', utc=True).dt.tz_localize(None).to_numpy()
+
+
+# Nominal local sensor cadence; a sample_interval of k averages k-sample time buckets
+LOCAL_SAMPLE_SECONDS = 5
+
+# Correlation panels with more points than this are drawn as hexbin densities
+CORRELATION_SCATTER_MAX_POINTS = 500
+
+# (row count, newest id) of the rows a loader reads; any insert or replace in
+# the range changes it, so cache entries keyed on it never go stale
+_SQL_LOCAL_SIGNATURE = """
+    SELECT COUNT(*), MAX(id)
+    FROM magnetic_flux_data
+    WHERE {range_column} BETWEEN ? AND ?
+"""
+
+_SQL_USGS_SIGNATURE = """
+    SELECT COUNT(*), MAX(id)
+    FROM usgs_magnetic_data
+    WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
+"""
+
+
+def _epoch_seconds(t, round_up=False):
+    """
+    Unix seconds for a range bound. Naive datetimes are taken as UTC, like the
+    stored created_at values; rounding keeps BETWEEN inclusive exactly where
+    the old timestamp-string comparison was.
+    """
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    seconds = t.timestamp()
+    return math.ceil(seconds) if round_up else math.floor(seconds)
+
+
+def _sql_timestamp(t):
+    """Range bound in SQLite's stored TEXT timestamp format, bound as a plain string."""
+    return t.isoformat(sep=' ')
+
+
+def _envelope(times, values, nbins):
+    """
+    Aggregate a time series into nbins equal-width time bins.
+
+    Returns:
+        (centers, minimum, maximum, mean) for each non-empty bin, where centers
+        are midway between the first and last sample in the bin
+    """
+    t = times.astype('datetime64[ns]').view('i8')
+    edges = np.linspace(t[0], t[-1], nbins + 1)[:-1]
+    starts = np.unique(np.searchsorted(t, edges))
+    ends = np.append(starts[1:], t.size)
+
+    first = t[starts]
+    centers = (first + (t[ends - 1] - first) // 2).view('datetime64[ns]')
+    minimum = np.minimum.reduceat(values, starts)
+    maximum = np.maximum.reduceat(values, starts)
+    mean = np.add.reduceat(values, starts) / (ends - starts)
+    return centers, minimum, maximum, mean
+
+
+def _plot_series(ax, times, values, color, **kwargs):
+    """
+    Plot a time series on ax. With more than two samples per bin at two bins
+    per pixel of axes width, draw a min/max band and a mean line instead, so
+    matplotlib gets O(width) vertices rather than one per sample.
+    """
+    nbins = 2 * max(1, int(ax.get_window_extent().width))
+    if len(values) <= 2 * nbins:
+        return ax.plot(times, values, color=color, **kwargs)
+
+    centers, minimum, maximum, mean = _envelope(times, values, nbins)
+    ax.fill_between(centers, minimum, maximum, color=color, alpha=0.3, linewidth=0)
+    return ax.plot(centers, mean, color=color, **kwargs)
+
+
+def _bin_means(times_ns, arrays, origin_ns, step_ns):
+    """
+    Average time-sorted samples over step_ns-wide bins anchored at origin_ns.
+
+    Args:
+        times_ns: Ascending int64 nanosecond timestamps
+        arrays: Dict of value arrays matching times_ns
+        origin_ns: Any bin boundary (e.g. the first reference timestamp)
+        step_ns: Bin width in nanoseconds
+
+    Returns:
+        (bin start times in ns, dict of per-bin mean arrays)
+    """
+    keys = (times_ns - origin_ns) // step_ns
+    unique_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    means = {key: np.add.reduceat(values, starts) / counts for key, values in arrays.items()}
+    return origin_ns + unique_keys * step_ns, means
+
+
+def _naive_ns(times):
+    """Timestamps as int64 nanoseconds, dropping any timezone information."""
+    times = np.asarray(times)
+    if times.dtype.kind != 'M':
+        times = np.array([t.replace(tzinfo=None) if getattr(t, 'tzinfo', None) else t
+                          for t in times], dtype='datetime64[ns]')
+    return times.astype('datetime64[ns]').view('i8')
+
+
 class MagneticFluxComparisonPlotter:
     """Compares local magnetic flux data with USGS observatory reference data."""
 
-    def __init__(self, db_path: str = "/deepsink1/weatherstation/data/weather_data.db"):
+    def __init__(self, db_path: str = "/deepsink1/weatherstation/data/weather_data.db", use_cache: bool = True):
         self.db_path = db_path
+        self.use_cache = use_cache
         self.calibration_values = self.load_calibration()
 
+        # One read-only connection shared by both loaders. Schema migrations
+        # are left to the writer (WeatherDatabase in the MQTT subscriber).
+        self._conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-65536")
+
+        # Integer created_at_epoch column, if the writer has migrated this
+        # database yet; otherwise local ranges are queried on created_at
+        flux_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(magnetic_flux_data)")}
+        self._has_epoch_column = 'created_at_epoch' in flux_columns
+
         # Observatory information for context
         self.observatories = {
             'BOU': 'Boulder, Colorado',
@@ -58,6 +338,24 @@ class MagneticFluxComparisonPlotter:
             'SJG': 'San Juan, Puerto Rico'
         }
 
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def _cache_path(self, signature_query, signature_params, *key_parts):
+        """
+        Cache file under CACHE_DIR for one loader call, or None with caching off.
+
+        The key covers the database, the signature of the rows the call reads
+        and key_parts (the call's range, sampling and other inputs).
+        """
+        if not self.use_cache:
+            return None
+        signature = tuple(self._conn.execute(signature_query, signature_params).fetchone())
+        key_source = '-'.join(str(part) for part in (os.path.abspath(self.db_path), signature) + key_parts)
+        key = hashlib.blake2b(key_source.encode(), digest_size=8).hexdigest()
+        return os.path.join(CACHE_DIR, f"comparison-{key}.npz")
+
     def load_calibration(self):
         """Load calibration values from JSON file."""
         calibration_file = "weather_station_calibration.json"
@@ -82,77 +380,44 @@ class MagneticFluxComparisonPlotter:
             return default_calibration
 
     def load_local_data(self, start_time: datetime, end_time: datetime, sample_interval: int = None):
-        """Load local HMC5883L magnetic flux data and apply calibration."""
+        """Load local HMC5883L magnetic flux data and apply calibration, reusing the on-disk cache."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Build query with optional sampling
-            if sample_interval and sample_interval > 1:
-                query = """
-                    SELECT x, y, z, created_at
-                    FROM (
-                        SELECT *, ROW_NUMBER() OVER (ORDER BY created_at) as rn
-                        FROM magnetic_flux_data
-                        WHERE created_at BETWEEN ? AND ?
-                    )
-                    WHERE rn % ? = 1
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time, sample_interval)
+            # Whole-minute bounds, so runs within the same minute share a cache entry
+            start_time, end_time = cache_time_range(start_time, end_time)
+
+            # Range and buckets use the integer created_at_epoch column, read
+            # entirely from its covering (created_at_epoch, x, y, z) index;
+            # unmigrated databases compare created_at text as before
+            if self._has_epoch_column:
+                time_range = (_epoch_seconds(start_time, round_up=True), _epoch_seconds(end_time))
+                range_column = 'created_at_epoch'
             else:
-                query = """
-                    SELECT x, y, z, created_at
-                    FROM magnetic_flux_data
-                    WHERE created_at BETWEEN ? AND ?
-                    ORDER BY created_at ASC
-                """
-                params = (start_time, end_time)
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            conn.close()
-
-            if not rows:
-                print("No local magnetic flux data found in specified time range")
-                return None
-
-            # Parse data
-            times = []
-            x_values = []
-            y_values = []
-            z_values = []
-
-            for row in rows:
-                x, y, z, timestamp_str = row
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', ''))
-                times.append(timestamp)
-                x_values.append(float(x))
-                y_values.append(float(y))
-                z_values.append(float(z))
-
-            # Convert to numpy arrays
-            times = np.array(times)
-            x_raw = np.array(x_values)
-            y_raw = np.array(y_values)
-            z_raw = np.array(z_values)
-
-            # Apply calibration to convert raw LSb values to Tesla
-            x_array = (x_raw * self.calibration_values['magnetic_flux_x_scale']) + self.calibration_values['magnetic_flux_x_offset']
-            y_array = (y_raw * self.calibration_values['magnetic_flux_y_scale']) + self.calibration_values['magnetic_flux_y_offset']
-            z_array = (z_raw * self.calibration_values['magnetic_flux_z_scale']) + self.calibration_values['magnetic_flux_z_offset']
-
-            magnitude = np.sqrt(x_array**2 + y_array**2 + z_array**2)
+                time_range = (_sql_timestamp(start_time), _sql_timestamp(end_time))
+                range_column = 'created_at'
+            calibration = json.dumps(self.calibration_values, sort_keys=True, default=str)
+            cache_path = self._cache_path(_SQL_LOCAL_SIGNATURE.format(range_column=range_column), time_range,
+                                          'local', time_range, sample_interval, calibration)
+
+            arrays = read_cache(cache_path)
+            if arrays is not None:
+                print(f"Loaded local data from cache {cache_path}")
+            else:
+                arrays = self._query_local_data(time_range, sample_interval)
+                if arrays is None:
+                    print("No local magnetic flux data found in specified time range")
+                    return None
+                write_cache(cache_path, arrays)
 
+            x_array = arrays['x']
             print(f"Loaded {len(x_array)} local data points")
             print(f"Local calibrated range: X=[{x_array.min():.2e}, {x_array.max():.2e}] Tesla")
 
             return {
-                'times': times,
+                'times': arrays['times'],
                 'x': x_array,
-                'y': y_array,
-                'z': z_array,
-                'magnitude': magnitude,
+                'y': arrays['y'],
+                'z': arrays['z'],
+                'magnitude': arrays['magnitude'],
                 'source': 'Local HMC5883L'
             }
 
@@ -160,87 +425,108 @@ class MagneticFluxComparisonPlotter:
             print(f"Error loading local data: {e}")
             return None
 
+    def _query_local_data(self, time_range, sample_interval):
+        """
+        Query and calibrate local flux data for a time range.
+
+        Args:
+            time_range: (start, end) as epoch seconds, or as created_at
+                timestamp strings when the database has no created_at_epoch
+            sample_interval: Average buckets of this many nominal samples
+
+        Returns:
+            Dict of times, x, y, z and magnitude arrays (Tesla), or None if no rows
+        """
+        if self._has_epoch_column:
+            range_column = epoch = 'created_at_epoch'
+        else:
+            range_column = 'created_at'
+            epoch = "CAST(strftime('%s', created_at) AS INTEGER)"
+
+        # Build query with optional sampling
+        # (time buckets of sample_interval nominal samples, averaged in SQL)
+        if sample_interval and sample_interval > 1:
+            query = f"""
+                SELECT AVG(x) AS x, AVG(y) AS y, AVG(z) AS z, MIN({epoch}) AS created_at_epoch
+                FROM magnetic_flux_data
+                WHERE {range_column} BETWEEN ? AND ?
+                GROUP BY {epoch} / ?
+                ORDER BY 4 ASC
+            """
+            params = time_range + (sample_interval * LOCAL_SAMPLE_SECONDS,)
+        else:
+            query = f"""
+                SELECT x, y, z, {epoch} AS created_at_epoch
+                FROM magnetic_flux_data
+                WHERE {range_column} BETWEEN ? AND ?
+                ORDER BY {range_column} ASC
+            """
+            params = time_range
+
+        # Fetch straight into columns; no per-row Python parsing
+        df = pd.read_sql_query(query, self._conn, params=params)
+        if df.empty:
+            return None
+
+        times = df['created_at_epoch'].to_numpy(dtype=np.int64).astype('datetime64[s]')
+        x_raw = df['x'].to_numpy(dtype=np.float64)
+        y_raw = df['y'].to_numpy(dtype=np.float64)
+        z_raw = df['z'].to_numpy(dtype=np.float64)
+
+        # Apply calibration to convert raw LSb values to Tesla
+        cal = self.calibration_values
+        x_array = _calibrate(x_raw, cal['magnetic_flux_x_scale'], cal['magnetic_flux_x_offset'])
+        y_array = _calibrate(y_raw, cal['magnetic_flux_y_scale'], cal['magnetic_flux_y_offset'])
+        z_array = _calibrate(z_raw, cal['magnetic_flux_z_scale'], cal['magnetic_flux_z_offset'])
+
+        return {
+            'times': times,
+            'x': x_array,
+            'y': y_array,
+            'z': z_array,
+            'magnitude': _magnitude(x_array, y_array, z_array)
+        }
+
     def load_usgs_data(self, observatory_code: str, start_time: datetime, end_time: datetime, sample_interval: int = None):
-        """Load USGS magnetic observatory data."""
+        """Load USGS magnetic observatory data, reusing the on-disk cache."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn.cursor()
 
-            # Check if USGS data exists
-            cursor.execute("SELECT COUNT(*) FROM usgs_magnetic_data WHERE observatory_code = ?", (observatory_code,))
-            if cursor.fetchone()[0] == 0:
+            # Check if USGS data exists (stops at the first index entry)
+            cursor.execute("SELECT 1 FROM usgs_magnetic_data WHERE observatory_code = ? LIMIT 1", (observatory_code,))
+            if cursor.fetchone() is None:
                 print(f"No USGS data found for observatory {observatory_code}")
                 print("Run usgs_magnetic_importer.py first to import reference data")
-                conn.close()
                 return None
 
-            # Build query with optional sampling
-            if sample_interval and sample_interval > 1:
-                query = """
-                    SELECT x, y, z, f, data_timestamp
-                    FROM (
-                        SELECT *, ROW_NUMBER() OVER (ORDER BY data_timestamp) as rn
-                        FROM usgs_magnetic_data
-                        WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
-                    )
-                    WHERE rn % ? = 1
-                    ORDER BY data_timestamp ASC
-                """
-                params = (observatory_code, start_time, end_time, sample_interval)
-            else:
-                query = """
-                    SELECT x, y, z, f, data_timestamp
-                    FROM usgs_magnetic_data
-                    WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
-                    ORDER BY data_timestamp ASC
-                """
-                params = (observatory_code, start_time, end_time)
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            conn.close()
-
-            if not rows:
-                print(f"No USGS data found for {observatory_code} in specified time range")
-                return None
+            # Whole-minute bounds, so runs within the same minute share a cache entry
+            start_time, end_time = cache_time_range(start_time, end_time)
+            time_range = (_sql_timestamp(start_time), _sql_timestamp(end_time))
+            cache_path = self._cache_path(_SQL_USGS_SIGNATURE, (observatory_code,) + time_range,
+                                          'usgs', observatory_code, time_range, sample_interval)
 
-            # Parse data (already in Tesla units)
-            times = []
-            x_values = []
-            y_values = []
-            z_values = []
-            f_values = []
-
-            for row in rows:
-                x, y, z, f, timestamp_str = row
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', ''))
-                times.append(timestamp)
-                x_values.append(float(x))
-                y_values.append(float(y))
-                z_values.append(float(z))
-                if f is not None:
-                    f_values.append(float(f))
-
-            # Convert to numpy arrays
-            times = np.array(times)
-            x_array = np.array(x_values)
-            y_array = np.array(y_values)
-            z_array = np.array(z_values)
-            f_array = np.array(f_values) if f_values else None
-
-            magnitude = np.sqrt(x_array**2 + y_array**2 + z_array**2)
+            arrays = read_cache(cache_path)
+            if arrays is not None:
+                print(f"Loaded USGS data from cache {cache_path}")
+            else:
+                arrays = self._query_usgs_data(observatory_code, time_range, sample_interval)
+                if arrays is None:
+                    print(f"No USGS data found for {observatory_code} in specified time range")
+                    return None
+                write_cache(cache_path, arrays)
 
+            x_array = arrays['x']
             observatory_name = self.observatories.get(observatory_code, observatory_code)
             print(f"Loaded {len(x_array)} USGS data points from {observatory_name}")
             print(f"USGS range: X=[{x_array.min():.2e}, {x_array.max():.2e}] Tesla")
 
             return {
-                'times': times,
+                'times': arrays['times'],
                 'x': x_array,
-                'y': y_array,
-                'z': z_array,
-                'f': f_array,
-                'magnitude': magnitude,
+                'y': arrays['y'],
+                'z': arrays['z'],
+                'f': arrays.get('f'),
+                'magnitude': arrays['magnitude'],
                 'source': f'USGS {observatory_code} ({observatory_name})',
                 'observatory': observatory_code
             }
@@ -249,58 +535,117 @@ class MagneticFluxComparisonPlotter:
             print(f"Error loading USGS data: {e}")
             return None
 
-    def align_time_series(self, local_data, usgs_data, tolerance_minutes=5):
-        """Align local and USGS data by timestamp with tolerance."""
-        if not local_data or not usgs_data:
-            return None, None
-
-        tolerance = timedelta(minutes=tolerance_minutes)
-
-        aligned_local = {'times': [], 'x': [], 'y': [], 'z': [], 'magnitude': []}
-        aligned_usgs = {'times': [], 'x': [], 'y': [], 'z': [], 'magnitude': []}
-
-        # Convert all timestamps to timezone-naive for comparison
-        local_times_naive = []
-        for t in local_data['times']:
-            if hasattr(t, 'tzinfo') and t.tzinfo is not None:
-                local_times_naive.append(t.replace(tzinfo=None))
-            else:
-                local_times_naive.append(t)
-
-        usgs_times_naive = []
-        for t in usgs_data['times']:
-            if hasattr(t, 'tzinfo') and t.tzinfo is not None:
-                usgs_times_naive.append(t.replace(tzinfo=None))
-            else:
-                usgs_times_naive.append(t)
-
-        usgs_times_naive = np.array(usgs_times_naive)
-
-        for i, local_time in enumerate(local_times_naive):
-            # Find closest USGS time within tolerance
-            time_diffs = np.abs(usgs_times_naive - local_time)
-            min_diff_idx = np.argmin(time_diffs)
+    def _query_usgs_data(self, observatory_code, time_range, sample_interval):
+        """
+        Query USGS observatory data for a range of stored-format timestamps.
+
+        Returns:
+            Dict of times, x, y, z, f (None without total-field values) and
+            magnitude arrays (Tesla), or None if no rows
+        """
+        # Build query with optional sampling
+        # (same time buckets as the local data, so both sides line up)
+        if sample_interval and sample_interval > 1:
+            query = """
+                SELECT AVG(x) AS x, AVG(y) AS y, AVG(z) AS z, AVG(f) AS f,
+                       MIN(data_timestamp) AS data_timestamp
+                FROM usgs_magnetic_data
+                WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
+                GROUP BY CAST(strftime('%s', data_timestamp) AS INTEGER) / ?
+                ORDER BY 5 ASC
+            """
+            params = (observatory_code,) + time_range + (sample_interval * LOCAL_SAMPLE_SECONDS,)
+        else:
+            query = """
+                SELECT x, y, z, f, data_timestamp
+                FROM usgs_magnetic_data
+                WHERE observatory_code = ? AND data_timestamp BETWEEN ? AND ?
+                ORDER BY data_timestamp ASC
+            """
+            params = (observatory_code,) + time_range
+
+        # Fetch straight into columns; no per-row Python parsing
+        df = pd.read_sql_query(query, self._conn, params=params)
+        if df.empty:
+            return None
 
-            if time_diffs[min_diff_idx] <= tolerance:
-                aligned_local['times'].append(local_time)
-                aligned_local['x'].append(local_data['x'][i])
-                aligned_local['y'].append(local_data['y'][i])
-                aligned_local['z'].append(local_data['z'][i])
-                aligned_local['magnitude'].append(local_data['magnitude'][i])
+        # Parse data (already in Tesla units)
+        x_array = df['x'].to_numpy(dtype=np.float64)
+        y_array = df['y'].to_numpy(dtype=np.float64)
+        z_array = df['z'].to_numpy(dtype=np.float64)
+        f_values = df['f'].dropna()
+
+        return {
+            'times': _parse_timestamps(df['data_timestamp']),
+            'x': x_array,
+            'y': y_array,
+            'z': z_array,
+            'f': f_values.to_numpy(dtype=np.float64) if len(f_values) else None,
+            'magnitude': _magnitude(x_array, y_array, z_array)
+        }
 
-                aligned_usgs['times'].append(usgs_data['times'][min_diff_idx])
-                aligned_usgs['x'].append(usgs_data['x'][min_diff_idx])
-                aligned_usgs['y'].append(usgs_data['y'][min_diff_idx])
-                aligned_usgs['z'].append(usgs_data['z'][min_diff_idx])
-                aligned_usgs['magnitude'].append(usgs_data['magnitude'][min_diff_idx])
+    def align_time_series(self, local_data, usgs_data, tolerance_minutes=5, bin_local=False):
+        """
+        Align local and USGS data by timestamp with tolerance.
+
+        Args:
+            local_data: Local series from load_local_data()
+            usgs_data: Reference series from load_usgs_data()
+            tolerance_minutes: Maximum distance to the matched USGS sample
+            bin_local: When local samples are at least twice as dense as the
+                USGS series, first average them into bins on the USGS time grid.
+                Off by default: every local sample is matched to its nearest
+                USGS sample, so statistics stay comparable with earlier runs
+
+        Returns:
+            (aligned_local, aligned_usgs) dicts of equal-length arrays, or
+            (None, None) if nothing overlaps
+        """
+        if not local_data or not usgs_data:
+            return None, None
 
-        # Convert to numpy arrays
+        tolerance_ns = int(tolerance_minutes * 60 * 1e9)
+
+        # Work in int64 nanoseconds so the nearest-neighbour search is a single
+        # binary search over the sorted USGS times rather than a scan per sample
+        lt = _naive_ns(local_data['times'])
+        ut = _naive_ns(usgs_data['times'])
+        local_arrays = {key: np.asarray(local_data[key]) for key in ['x', 'y', 'z', 'magnitude']}
+
+        order = np.argsort(ut, kind='stable')
+        ut_s = ut[order]
+
+        # Several 5 s local samples fall in each 1 min USGS interval; averaging
+        # them onto the USGS grid first shrinks everything downstream and
+        # matches each reference value with the local mean over its interval
+        if bin_local and len(ut_s) > 1 and len(lt) > 1:
+            usgs_step = int(np.median(np.diff(ut_s)))
+            if usgs_step > 0 and usgs_step >= 2 * np.median(np.diff(lt)):
+                n_samples = len(lt)
+                lt, local_arrays = _bin_means(lt, local_arrays, ut_s[0], usgs_step)
+                print(f"Averaged {n_samples} local samples into {len(lt)} bins of {usgs_step / 1e9:g} s")
+
+        if len(ut_s) > 1:
+            idx = np.clip(np.searchsorted(ut_s, lt), 1, len(ut_s) - 1)
+            left = ut_s[idx - 1]
+            right = ut_s[idx]
+            # Ties go to the earlier sample, as argmin did
+            chosen = np.where((right - lt) < (lt - left), idx, idx - 1)
+        else:
+            chosen = np.zeros(len(lt), dtype=np.intp)
+
+        mask = np.abs(ut_s[chosen] - lt) <= tolerance_ns
+        local_idx = np.nonzero(mask)[0]
+        usgs_idx = order[chosen[mask]]
+
+        aligned_local = {'times': lt[local_idx].view('datetime64[ns]')}
+        aligned_usgs = {'times': np.asarray(usgs_data['times'])[usgs_idx]}
         for key in ['x', 'y', 'z', 'magnitude']:
-            aligned_local[key] = np.array(aligned_local[key])
-            aligned_usgs[key] = np.array(aligned_usgs[key])
-
-        aligned_local['times'] = np.array(aligned_local['times'])
-        aligned_usgs['times'] = np.array(aligned_usgs['times'])
+            aligned_local[key] = local_arrays[key][local_idx]
+            aligned_usgs[key] = np.asarray(usgs_data[key])[usgs_idx]
+            # Microtesla copies, converted once for the statistics and all plots
+            aligned_local[key + '_uT'] = aligned_local[key] * 1e6
+            aligned_usgs[key + '_uT'] = aligned_usgs[key] * 1e6
 
         # Preserve source labels
         aligned_local['source'] = local_data['source']
@@ -315,36 +660,34 @@ class MagneticFluxComparisonPlotter:
         return aligned_local, aligned_usgs
 
     def calculate_statistics(self, local_data, usgs_data):
-        """Calculate comparison statistics between local and USGS data."""
+        """Calculate comparison statistics between aligned local and USGS data (see align_time_series)."""
         if not local_data or not usgs_data:
             return None
 
         stats_dict = {}
 
         for component in ['x', 'y', 'z', 'magnitude']:
-            local_vals = local_data[component] * 1e6  # Convert to microtesla
-            usgs_vals = usgs_data[component] * 1e6    # Convert to microtesla
-
-            # Calculate differences
-            diff = local_vals - usgs_vals
+            (local_mean, usgs_mean, local_std, usgs_std,
+             diff_mean, diff_std, diff_rms, correlation) = _pair_stats(local_data[component + '_uT'],
+                                                                       usgs_data[component + '_uT'])
 
-            # Basic statistics
+            # Basic statistics (microtesla)
             stats_dict[component] = {
-                'local_mean': np.mean(local_vals),
-                'usgs_mean': np.mean(usgs_vals),
-                'local_std': np.std(local_vals),
-                'usgs_std': np.std(usgs_vals),
-                'diff_mean': np.mean(diff),
-                'diff_std': np.std(diff),
-                'diff_rms': np.sqrt(np.mean(diff**2)),
-                'correlation': np.corrcoef(local_vals, usgs_vals)[0, 1] if len(local_vals) > 1 else 0
+                'local_mean': local_mean,
+                'usgs_mean': usgs_mean,
+                'local_std': local_std,
+                'usgs_std': usgs_std,
+                'diff_mean': diff_mean,
+                'diff_std': diff_std,
+                'diff_rms': diff_rms,
+                'correlation': correlation
             }
 
         return stats_dict
 
     def create_comparison_plot(self, local_data, usgs_data, title_suffix=""):
         """Create side-by-side comparison plots."""
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10), sharex=True)
         fig.suptitle(f'Magnetic Field Comparison {title_suffix}', fontsize=14, fontweight='bold')
 
         components = ['x', 'y', 'z', 'magnitude']
@@ -353,12 +696,11 @@ class MagneticFluxComparisonPlotter:
         for i, (comp, name) in enumerate(zip(components, component_names)):
             ax = axes[i//2, i%2]
 
-            # Convert Tesla to microtesla for display
-            local_vals = local_data[comp] * 1e6
-            usgs_vals = usgs_data[comp] * 1e6
+            local_vals = local_data[comp + '_uT']
+            usgs_vals = usgs_data[comp + '_uT']
 
-            ax.plot(local_data['times'], local_vals, 'b-', label=local_data['source'], alpha=0.7, linewidth=1)
-            ax.plot(usgs_data['times'], usgs_vals, 'r-', label=usgs_data['source'], alpha=0.7, linewidth=1)
+            _plot_series(ax, local_data['times'], local_vals, 'b', label=local_data['source'], alpha=0.7, linewidth=1)
+            _plot_series(ax, usgs_data['times'], usgs_vals, 'r', label=usgs_data['source'], alpha=0.7, linewidth=1)
 
             ax.set_title(f'{name} Component')
             ax.set_ylabel('Magnetic Field (μT)')
@@ -377,7 +719,7 @@ class MagneticFluxComparisonPlotter:
 
     def create_difference_plot(self, local_data, usgs_data, title_suffix=""):
         """Create plots showing differences between local and USGS data."""
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10), sharex=True)
         fig.suptitle(f'Local vs USGS Differences {title_suffix}', fontsize=14, fontweight='bold')
 
         components = ['x', 'y', 'z', 'magnitude']
@@ -387,11 +729,9 @@ class MagneticFluxComparisonPlotter:
             ax = axes[i//2, i%2]
 
             # Calculate differences in microtesla
-            local_vals = local_data[comp] * 1e6
-            usgs_vals = usgs_data[comp] * 1e6
-            diff = local_vals - usgs_vals
+            diff = local_data[comp + '_uT'] - usgs_data[comp + '_uT']
 
-            ax.plot(local_data['times'], diff, 'g-', alpha=0.7, linewidth=1)
+            _plot_series(ax, local_data['times'], diff, 'g', alpha=0.7, linewidth=1)
             ax.axhline(y=0, color='k', linestyle='--', alpha=0.5)
 
             # Add statistics text
@@ -426,20 +766,27 @@ class MagneticFluxComparisonPlotter:
         for i, (comp, name) in enumerate(zip(components, component_names)):
             ax = axes[i//2, i%2]
 
-            # Convert to microtesla
-            local_vals = local_data[comp] * 1e6
-            usgs_vals = usgs_data[comp] * 1e6
+            local_vals = local_data[comp + '_uT']
+            usgs_vals = usgs_data[comp + '_uT']
 
-            ax.scatter(usgs_vals, local_vals, alpha=0.6, s=10)
+            # Small sets as points; large ones as a density, so rendering is
+            # bounded by the hexagon grid rather than the number of samples
+            if len(local_vals) <= CORRELATION_SCATTER_MAX_POINTS:
+                ax.scatter(usgs_vals, local_vals, alpha=0.6, s=10)
+            else:
+                hb = ax.hexbin(usgs_vals, local_vals, gridsize=60, mincnt=1, cmap='viridis')
+                fig.colorbar(hb, ax=ax, label='Samples')
 
             # Add perfect correlation line
-            min_val = min(np.min(local_vals), np.min(usgs_vals))
-            max_val = max(np.max(local_vals), np.max(usgs_vals))
+            local_min, local_max = _minmax(local_vals)
+            usgs_min, usgs_max = _minmax(usgs_vals)
+            min_val = min(local_min, usgs_min)
+            max_val = max(local_max, usgs_max)
             ax.plot([min_val, max_val], [min_val, max_val], 'r--', alpha=0.8, label='Perfect correlation')
 
             # Calculate and display correlation coefficient
             if len(local_vals) > 1:
-                corr_coef = np.corrcoef(local_vals, usgs_vals)[0, 1]
+                corr_coef = _pair_stats(local_vals, usgs_vals)[-1]
                 ax.text(0.05, 0.95, f'r = {corr_coef:.3f}', transform=ax.transAxes,
                        verticalalignment='top', bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
 
@@ -474,6 +821,13 @@ class MagneticFluxComparisonPlotter:
 
         print("\n" + "="*80)
 
+def save_figures(figures):
+    """Save (plot type, figure, filename) triples, rendering them concurrently when possible."""
+    jobs = [(fig, filename) for _, fig, filename in figures]
+    for (plot_type, _, _), filename in zip(figures, save_figures_parallel(jobs, dpi=150)):
+        print(f"Saved {plot_type} plot: {filename}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Compare local magnetic flux data with USGS observatory data')
     parser.add_argument('--observatory', '-o', required=True, help='USGS observatory code (BOU, FRD, TUC, HON, SJG)')
@@ -487,6 +841,11 @@ def main():
     parser.add_argument('--save', action='store_true', help='Save plots to files')
     parser.add_argument('--output-dir', default='comparison_plots', help='Output directory for saved plots')
     parser.add_argument('--tolerance', type=int, default=5, help='Time alignment tolerance in minutes')
+    parser.add_argument('--bin-local', action='store_true',
+                        help='Average local samples onto the USGS time grid before aligning '
+                             '(faster on dense data; statistics differ from nearest-sample matching)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write loaded data under {CACHE_DIR}')
 
     args = parser.parse_args()
 
@@ -512,19 +871,20 @@ def main():
     print(f"Observatory: {args.observatory}")
 
     # Create plotter and load data
-    plotter = MagneticFluxComparisonPlotter(args.db)
+    plotter = MagneticFluxComparisonPlotter(args.db, use_cache=not args.no_cache)
 
     # Determine sampling for large datasets
     time_span = end_time - start_time
-    estimated_points = int(time_span.total_seconds() / 5)  # Assuming 5-second intervals
+    estimated_points = int(time_span.total_seconds() / LOCAL_SAMPLE_SECONDS)
     max_points = 2000
     sample_interval = max(1, estimated_points // max_points) if estimated_points > max_points else None
 
     if sample_interval:
-        print(f"Using data sampling (every {sample_interval} points) for performance")
+        print(f"Using data sampling ({sample_interval * LOCAL_SAMPLE_SECONDS} s averages) for performance")
 
     local_data = plotter.load_local_data(start_time, end_time, sample_interval)
     usgs_data = plotter.load_usgs_data(args.observatory, start_time, end_time, sample_interval)
+    plotter.close()
 
     if not local_data:
         print("No local magnetic flux data available. Check your database and time range.")
@@ -535,7 +895,8 @@ def main():
         return
 
     # Align time series
-    aligned_local, aligned_usgs = plotter.align_time_series(local_data, usgs_data, args.tolerance)
+    aligned_local, aligned_usgs = plotter.align_time_series(local_data, usgs_data, args.tolerance,
+                                                             bin_local=args.bin_local)
 
     if not aligned_local or not aligned_usgs:
         print("No overlapping data found. Check time ranges and try increasing tolerance.")
@@ -566,10 +927,8 @@ def main():
         os.makedirs(args.output_dir, exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        for plot_type, fig in figures:
-            filename = f"{args.output_dir}/magnetic_comparison_{plot_type}_{args.observatory}_{timestamp}.png"
-            fig.savefig(filename, dpi=150, bbox_inches='tight')
-            print(f"Saved {plot_type} plot: {filename}")
+        save_figures([(plot_type, fig, f"{args.output_dir}/magnetic_comparison_{plot_type}_{args.observatory}_{timestamp}.png")
+                      for plot_type, fig in figures])
 
     # Show plots if not saving
     if not args.save:
@@ -21,9 +21,9 @@ NOTE: Daemon mode is DISABLED in development version.
 """
 
 import argparse
+import importlib.util
+import logging
 import sys
-from weather_gui import WeatherGUI, SimpleWeatherDisplay, GTK_AVAILABLE
-from weather_daemon import WeatherDaemon
 
 
 def main():
@@ -67,21 +67,30 @@ def main():
         sys.exit(1)
 
     # Regular GUI/console modes
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
     print("Weather Station Monitor")
     print("======================")
     print(f"MQTT Broker: {args.host}:{args.port}")
     print(f"Database: {args.db}")
 
-    # Determine which interface to use
-    if args.console or not GTK_AVAILABLE:
+    # Determine which interface to use. weather_gui (GTK, matplotlib, MQTT)
+    # is imported only here, once a mode that needs it has been chosen.
+    if args.console or importlib.util.find_spec('gi') is None:
+        gtk_available = False
+    else:
+        from weather_gui import GTK_AVAILABLE as gtk_available
+
+    if not gtk_available:
         if args.console:
             print("Console mode requested")
         else:
             print("GTK not available, using console mode")
         print("Starting console interface...")
+        from weather_gui import SimpleWeatherDisplay
         app = SimpleWeatherDisplay()
     else:
         print("Starting GTK GUI...")
+        from weather_gui import WeatherGUI
         app = WeatherGUI()
 
     try:
@@ -3,82 +3,196 @@ MQTT subscriber for weather station data collection.
 """
 import json
 import logging
+import queue
 import threading
-from typing import Callable, Optional
+import time
+from typing import Callable, Dict, List, Optional
 
 import paho.mqtt.client as mqtt
 
 from database import WeatherDatabase
 
+# Optional faster JSON parsing; orjson.JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both parsers take the raw payload bytes, so no intermediate str is decoded
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Received readings are buffered and written in one transaction per table
+# every FLUSH_INTERVAL seconds, or as soon as FLUSH_MAX_ROWS are waiting
+FLUSH_INTERVAL = 0.5
+FLUSH_MAX_ROWS = 100
+
+# Queued to the worker thread to make it flush and exit
+_STOP = object()
+
+# Handlers and levels are left to the application (daemon, GUI or __main__)
+logger = logging.getLogger(__name__)
+
 
 class WeatherMQTTSubscriber:
     """MQTT subscriber for weather station data."""
 
+    # Topic leaf (last path segment) -> buffer its readings are queued in
+    _TOPIC_BUFFERS = {
+        "weathermeters": "_pending_weather",
+        "magneticfluxsensor": "_pending_flux",
+    }
+
+    # Payload fields backing NOT NULL columns, per buffer; readings missing
+    # one are rejected before buffering so they cannot fail a whole batch
+    _REQUIRED_FIELDS = {
+        "_pending_weather": ("utc",),
+        "_pending_flux": ("x", "y", "z"),
+    }
+
     def __init__(self, host: str = "localhost", port: int = 1883, db_path: str = "/deepsink1/weatherstation/data/weather_data.db"):
         self.host = host
         self.port = port
-        self.client = mqtt.Client()
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.database = WeatherDatabase(db_path)
         self.running = False
         self.data_callback: Optional[Callable] = None
 
+        # Raw (topic, payload) pairs from the network thread, consumed by the
+        # worker thread, which parses them and batches the database writes
+        self._messages: queue.SimpleQueue = queue.SimpleQueue()
+        self._worker_thread: Optional[threading.Thread] = None
+
+        # Readings waiting for the next batched insert
+        self._pending_weather: List[Dict] = []
+        self._pending_flux: List[Dict] = []
+        self._pending_lock = threading.Lock()
+
         # Configure MQTT client
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
 
-        # Set up logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
 
     def set_data_callback(self, callback: Callable) -> None:
         """Set callback function to be called when new data arrives."""
         self.data_callback = callback
 
-    def _on_connect(self, client, userdata, flags, rc):
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
         """Callback for when the client receives a CONNACK response from the server."""
-        if rc == 0:
+        if not reason_code.is_failure:
             self.logger.info("Connected to MQTT broker")
             # Subscribe to all weather station topics
             client.subscribe("backacres/house/weatherstation/#")
             self.logger.info("Subscribed to weather station topics")
         else:
-            self.logger.error(f"Failed to connect to MQTT broker, return code {rc}")
+            self.logger.error(f"Failed to connect to MQTT broker, reason: {reason_code}")
 
-    def _on_disconnect(self, client, userdata, rc):
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback for when the client disconnects from the server."""
-        if rc != 0:
+        if reason_code.is_failure:
             self.logger.warning("Unexpected disconnection from MQTT broker")
         else:
             self.logger.info("Disconnected from MQTT broker")
 
     def _on_message(self, client, userdata, msg):
-        """Callback for when a PUBLISH message is received from the server."""
-        try:
-            topic = msg.topic
-            payload = msg.payload.decode('utf-8')
+        """Callback for when a PUBLISH message is received; only hands it to the worker thread."""
+        self._messages.put((msg.topic, msg.payload))
+
+    def _process_message(self, topic: str, payload: bytes) -> None:
+        """Parse one message, queue its reading for the database and notify the data callback."""
+        # Route on the topic before touching the payload; topics are published
+        # as backacres/house/weatherstation/<leaf>/
+        buffer_name = self._TOPIC_BUFFERS.get(topic.rstrip("/").rsplit("/", 1)[-1])
 
+        # Neither stored nor passed on: not worth parsing
+        if buffer_name is None and not self.data_callback:
+            return
+
+        try:
             # Parse JSON data
-            data = json.loads(payload)
+            data = _json_loads(payload)
+
+            # Per-message detail at DEBUG; the payload is only formatted when enabled
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received data from %s: %s", topic, data)
 
-            self.logger.info(f"Received data from {topic}: {data}")
+            # Queue data for the database based on topic
+            if buffer_name is not None:
+                if not isinstance(data, dict):
+                    raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                missing = [field for field in self._REQUIRED_FIELDS[buffer_name] if data.get(field) is None]
+                if missing:
+                    raise ValueError(f"missing required fields {missing}")
 
-            # Store data in database based on topic
-            if "weathermeters" in topic:
-                self.database.insert_weather_data(data)
-                self.logger.info("Stored weather data in database")
-            elif "magneticfluxsensor" in topic:
-                self.database.insert_magnetic_flux_data(data)
-                self.logger.info("Stored magnetic flux data in database")
+                with self._pending_lock:
+                    pending = getattr(self, buffer_name)
+                    pending.append(data)
+                    full = len(pending) >= FLUSH_MAX_ROWS
+                if full:
+                    self.flush()
 
             # Call data callback if set (for real-time GUI updates)
             if self.data_callback:
                 self.data_callback(topic, data)
 
         except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON from {msg.topic}: {e}")
+            self.logger.error(f"Failed to parse JSON from {topic}: {e}")
         except Exception as e:
-            self.logger.error(f"Error processing message from {msg.topic}: {e}")
+            self.logger.error(f"Error processing message from {topic}: {e}")
+
+    def flush(self) -> None:
+        """Write all buffered readings, one transaction per table."""
+        with self._pending_lock:
+            weather, self._pending_weather = self._pending_weather, []
+            flux, self._pending_flux = self._pending_flux, []
+
+        if weather:
+            self._store(weather, "weather", self.database.insert_weather_batch,
+                        self.database.insert_weather_data)
+        if flux:
+            self._store(flux, "magnetic flux", self.database.insert_magnetic_flux_batch,
+                        self.database.insert_magnetic_flux_data)
+
+    def _store(self, rows: List[Dict], kind: str, insert_batch: Callable, insert_one: Callable) -> None:
+        """
+        Insert buffered readings in one transaction, falling back to one at a time.
+
+        A failed batch is rolled back as a whole, so its rows are retried
+        individually and only the readings that fail on their own are lost.
+        """
+        try:
+            insert_batch(rows)
+            self.logger.debug("Stored %d %s readings in database", len(rows), kind)
+            return
+        except Exception as e:
+            self.logger.warning(f"Batch insert of {len(rows)} {kind} readings failed ({e}), retrying one by one")
+
+        for data in rows:
+            try:
+                insert_one(data)
+            except Exception as e:
+                self.logger.error(f"Failed to store {kind} reading {data}: {e}")
+
+    def _worker(self) -> None:
+        """Process queued messages, flushing every FLUSH_INTERVAL seconds, until _STOP arrives."""
+        next_flush = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            try:
+                item = self._messages.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                break
+            if item is not None:
+                self._process_message(*item)
+
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + FLUSH_INTERVAL
+
+        self.flush()
 
     def start(self) -> None:
         """Start the MQTT subscriber."""
@@ -87,6 +201,11 @@ class WeatherMQTTSubscriber:
             self.client.connect(self.host, self.port, 60)
             self.running = True
 
+            # Start the message worker (once, also across reconnects)
+            if self._worker_thread is None or not self._worker_thread.is_alive():
+                self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+                self._worker_thread.start()
+
             # Start the network loop in a separate thread
             self.client.loop_start()
 
@@ -101,6 +220,12 @@ class WeatherMQTTSubscriber:
         self.client.loop_stop()
         self.client.disconnect()
 
+        # Let the worker drain the queue and store whatever is still buffered
+        if self._worker_thread is not None:
+            self._messages.put(_STOP)
+            self._worker_thread.join()
+            self._worker_thread = None
+
     def is_connected(self) -> bool:
         """Check if the MQTT client is connected."""
         return self.client.is_connected()
@@ -127,4 +252,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file
@@ -44,7 +44,7 @@ class PalmerValidationTest:
             'latitude': 61.5994,
             'longitude': -149.115,
             'elevation': 73.0,
-            'magnetic_declination': -17.5
+            'magnetic_declination': 14.3
         }
 
         # All USGS observatories
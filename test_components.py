@@ -43,16 +43,21 @@ def test_database():
     db.insert_magnetic_flux_data(test_flux_data)
     print("✓ Magnetic flux data inserted")
 
+    # Test batched insertion
+    db.insert_weather_batch([test_weather_data] * 3)
+    db.insert_magnetic_flux_batch([test_flux_data] * 3)
+    print("✓ Batched weather and flux data inserted")
+
     # Test data retrieval
     weather_data = db.get_latest_weather_data(1)
     if weather_data:
-        print(f"✓ Retrieved weather data: {weather_data[0]}")
+        print(f"✓ Retrieved weather data: {tuple(weather_data[0])}")
     else:
         print("✗ No weather data retrieved")
 
     flux_data = db.get_latest_magnetic_flux_data(1)
     if flux_data:
-        print(f"✓ Retrieved flux data: {flux_data[0]}")
+        print(f"✓ Retrieved flux data: {tuple(flux_data[0])}")
     else:
         print("✗ No flux data retrieved")
 
@@ -66,6 +71,117 @@ def test_database():
     print("Database test completed.\n")
 
 
+def test_calibrator_rotation():
+    """Test calibrator rotation matrix against scipy's Euler convention."""
+    print("Testing calibrator rotation...")
+
+    import numpy as np
+    from scipy.spatial.transform import Rotation
+    from magnetic_coordinate_calibrator import _euler_xyz_matrix
+
+    rng = np.random.default_rng(0)
+    points = rng.normal(0, 50000, (100, 3))
+
+    for angles in rng.uniform(-np.pi, np.pi, (10, 3)):
+        expected = Rotation.from_euler('xyz', angles).apply(points)
+        rotated = points @ _euler_xyz_matrix(*angles).T
+        if not np.allclose(rotated, expected, rtol=1e-12, atol=1e-12 * 50000):
+            print(f"✗ Rotation mismatch for angles {angles}")
+            break
+    else:
+        print("✓ Rotation matches Rotation.from_euler('xyz')")
+
+    print("Calibrator rotation test completed.\n")
+
+
+def test_calibrator_optimization():
+    """Test the staged calibration search against a full float64 multi-start fit."""
+    print("Testing calibrator optimization...")
+
+    import contextlib
+    import io
+    import numpy as np
+    from scipy.optimize import minimize
+    from magnetic_coordinate_calibrator import (MagneticCoordinateCalibrator, N_STARTS,
+                                                _euler_xyz_matrix, _stack_components)
+
+    # Synthetic 7 hours of minute data: drifting field, tilted sensor
+    rng = np.random.default_rng(3)
+    n = 420
+    U = (np.array([13000.0, 3500.0, 55000.0]) + np.cumsum(rng.normal(0, 20, (n, 3)), axis=0)
+         + 200 * np.sin(np.arange(n)[:, None] / 40 + np.array([0, 1, 2])))
+    Rm = _euler_xyz_matrix(0.3, -0.2, 1.2)
+    L = ((U - [300.0, -200.0, 150.0]) @ Rm) / [95.0, 100.0, 105.0] + rng.normal(0, 0.5, (n, 3))
+    local_data = dict(zip('xyz', L.T))
+    usgs_data = dict(zip('xyz', U.T))
+
+    calibrator = MagneticCoordinateCalibrator("test_weather.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        transformation = calibrator.optimize_transformation(local_data, usgs_data)
+
+    # Reference: every start fitted to convergence on the float64 arrays
+    L, U = _stack_components(local_data), _stack_components(usgs_data)
+    scale = np.mean(np.linalg.norm(U, axis=1)) / np.mean(np.linalg.norm(L, axis=1))
+    bounds = [(scale * 0.1, scale * 10)] * 3 + [(-np.pi, np.pi)] * 3 + [(-50000, 50000)] * 3
+    reference = np.inf
+    for seed in [np.zeros(3)] + [np.random.default_rng(k).uniform(-np.pi, np.pi, 3)
+                                 for k in range(N_STARTS - 1)]:
+        stage1 = minimize(calibrator._rot_offset_obj_and_grad, np.concatenate((seed, np.zeros(3))),
+                          args=(L * scale, U), method='L-BFGS-B', jac=True, bounds=bounds[3:9],
+                          options={'maxiter': 1000})
+        result = minimize(calibrator._obj_and_grad, np.concatenate(([scale] * 3, stage1.x)),
+                          args=(L, U), method='L-BFGS-B', jac=True, bounds=bounds,
+                          options={'maxiter': 1000})
+        reference = min(reference, result.fun)
+
+    if transformation and transformation['rms_error'] <= reference * (1 + 1e-6):
+        print(f"✓ Calibration RMS {transformation['rms_error']:.2f} nT "
+              f"(float64 multi-start {reference:.2f} nT)")
+    else:
+        rms = transformation['rms_error'] if transformation else None
+        print(f"✗ Calibration RMS {rms} nT worse than float64 multi-start {reference:.2f} nT")
+
+    print("Calibrator optimization test completed.\n")
+
+
+def test_mqtt_bad_readings():
+    """Test that a bad reading does not discard the readings batched with it."""
+    print("Testing MQTT subscriber with bad readings...")
+
+    db = WeatherDatabase("test_weather.db")
+    flux_before = db._conn.execute("SELECT COUNT(*) FROM magnetic_flux_data").fetchone()[0]
+    weather_before = db._conn.execute("SELECT COUNT(*) FROM weather_data").fetchone()[0]
+
+    subscriber = WeatherMQTTSubscriber(db_path="test_weather.db")
+    topic = "backacres/house/weatherstation/magneticfluxsensor/"
+
+    # 5 valid flux payloads, one missing z and one that is not an object
+    for i in range(5):
+        subscriber._process_message(topic, json.dumps({'x': 100.0 + i, 'y': -50.0, 'z': -25.0}).encode())
+    subscriber._process_message(topic, json.dumps({'x': 1.0, 'y': 2.0}).encode())
+    subscriber._process_message(topic, b"[1, 2, 3]")
+
+    # Weather payload without utc (timestamp is NOT NULL) next to a valid one
+    weather_topic = "backacres/house/weatherstation/weathermeters/"
+    subscriber._process_message(weather_topic, json.dumps({'temperature': 20.0}).encode())
+    subscriber._process_message(weather_topic, json.dumps({'utc': int(time.time()), 'temperature': 21.0}).encode())
+
+    # A bad row that reaches the buffer directly still only loses itself
+    subscriber._pending_flux.append({'x': 1.0, 'y': 2.0, 'z': None})
+    subscriber._pending_flux.append({'x': 3.0, 'y': 4.0, 'z': 5.0})
+    subscriber.flush()
+
+    flux_added = db._conn.execute("SELECT COUNT(*) FROM magnetic_flux_data").fetchone()[0] - flux_before
+    weather_added = db._conn.execute("SELECT COUNT(*) FROM weather_data").fetchone()[0] - weather_before
+
+    if flux_added == 6 and weather_added == 1:
+        print("✓ Valid readings stored, bad readings dropped")
+    else:
+        print(f"✗ Expected 6 flux and 1 weather rows, stored {flux_added} and {weather_added}")
+
+    print("MQTT bad readings test completed.\n")
+
+
 def test_mqtt_subscriber():
     """Test MQTT subscriber (requires MQTT broker)."""
     print("Testing MQTT subscriber...")
@@ -156,9 +272,18 @@ def main():
     # Test database
     test_database()
 
+    # Test calibrator rotation
+    test_calibrator_rotation()
+
+    # Test calibrator optimization
+    test_calibrator_optimization()
+
     # Simulate some data
     simulate_mqtt_data()
 
+    # Test bad readings in batched inserts
+    test_mqtt_bad_readings()
+
     # Test MQTT subscriber
     test_mqtt_subscriber()
 
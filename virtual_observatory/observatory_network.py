@@ -8,9 +8,27 @@ Identifies the 4 nearest observatories to Palmer, Alaska and provides data acces
 
 import numpy as np
 import math
+from functools import cached_property
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    from scipy.spatial import cKDTree
+    KDTREE_AVAILABLE = True
+except ImportError:
+    KDTREE_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _unit_ecef(lat_deg, lon_deg) -> np.ndarray:
+    """Convert latitude/longitude (degrees) to unit-sphere ECEF coordinates."""
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    return np.stack([np.cos(lat) * np.cos(lon),
+                     np.cos(lat) * np.sin(lon),
+                     np.sin(lat)], axis=-1)
+
 
 @dataclass
 class Observatory:
@@ -28,6 +46,10 @@ class Observatory:
 class ObservatoryNetwork:
     """Manages USGS geomagnetic observatory network for virtual observatory."""
 
+    # KD-tree over the (static) observatory catalog, shared by all instances
+    _catalog_tree = None
+    _catalog_codes = None
+
     def __init__(self, target_lat: float = 61.5994, target_lon: float = -149.115):
         """Initialize with target location (Palmer, Alaska)."""
         self.target_lat = target_lat
@@ -208,16 +230,37 @@ class ObservatoryNetwork:
 
     def _find_nearest_four(self) -> List[Observatory]:
         """Find the 4 nearest observatories to Palmer, Alaska."""
-        # Calculate distances for all observatories
-        for obs in self.observatories.values():
-            obs.distance_km = self.haversine_distance(
-                self.target_lat, self.target_lon,
-                obs.latitude, obs.longitude
-            )
-
-        # Sort by distance and take the 4 nearest
-        sorted_obs = sorted(self.observatories.values(), key=lambda x: x.distance_km)
-        return sorted_obs[:4]
+        if not KDTREE_AVAILABLE:
+            # Calculate distances for all observatories
+            for obs in self.observatories.values():
+                obs.distance_km = self.haversine_distance(
+                    self.target_lat, self.target_lon,
+                    obs.latitude, obs.longitude
+                )
+
+            # Sort by distance and take the 4 nearest
+            sorted_obs = sorted(self.observatories.values(), key=lambda x: x.distance_km)
+            return sorted_obs[:4]
+
+        # The catalog never changes, so the tree is built once per process
+        if ObservatoryNetwork._catalog_tree is None:
+            codes = list(self.observatories)
+            points = _unit_ecef([self.observatories[c].latitude for c in codes],
+                                [self.observatories[c].longitude for c in codes])
+            ObservatoryNetwork._catalog_codes = codes
+            ObservatoryNetwork._catalog_tree = cKDTree(points)
+
+        chord, idx = self._catalog_tree.query(_unit_ecef(self.target_lat, self.target_lon), k=4)
+
+        # Chord length on the unit sphere -> great circle distance
+        arc_km = EARTH_RADIUS_KM * 2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+        nearest = []
+        for i, distance in zip(idx, arc_km):
+            obs = self.observatories[self._catalog_codes[i]]
+            obs.distance_km = float(distance)
+            nearest.append(obs)
+        return nearest
 
     def get_nearest_observatories(self) -> List[Observatory]:
         """Get the 4 nearest observatories to the target location."""
@@ -229,6 +272,11 @@ class ObservatoryNetwork:
 
     def get_spatial_weights(self) -> np.ndarray:
         """Calculate inverse distance weights for spatial interpolation."""
+        return self._spatial_weights.copy()
+
+    @cached_property
+    def _spatial_weights(self) -> np.ndarray:
+        """Inverse distance weights, computed once per network (nearest_four is fixed)."""
         distances = np.array([obs.distance_km for obs in self.nearest_four])
 
         # Inverse distance weighting (avoid division by zero for exact matches)
@@ -294,6 +342,11 @@ class ObservatoryNetwork:
 
     def validate_network_geometry(self) -> Dict[str, float]:
         """Validate the geometric properties of the observatory network."""
+        return dict(self._network_geometry)
+
+    @cached_property
+    def _network_geometry(self) -> Dict[str, float]:
+        """Geometry statistics, computed once per network (nearest_four is fixed)."""
         coords = self.get_coordinate_matrix()
 
         # Calculate network properties
@@ -20,6 +20,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 import json
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 # ML and statistical libraries
 try:
@@ -29,6 +30,7 @@ try:
     from sklearn.metrics import mean_squared_error, r2_score
     from sklearn.preprocessing import StandardScaler
     from scipy.spatial.distance import cdist
+    from scipy.linalg import cho_solve
     from scipy import stats
     ML_AVAILABLE = True
 except ImportError as e:
@@ -38,6 +40,11 @@ except ImportError as e:
 from .observatory_network import ObservatoryNetwork, Observatory
 
 
+def _gp_kernel():
+    """Initial GP kernel over (lat, lon, elevation); hyperparameters are fitted per component."""
+    return ConstantKernel(1.0) * RBF(length_scale=100.0) + WhiteKernel(noise_level=0.1)
+
+
 @dataclass
 class InterpolationResult:
     """Result of spatial interpolation."""
@@ -89,7 +96,19 @@ class SpatialInterpolator:
         """
         # Calculate inverse distance weights with power parameter
         distances = np.array([obs.distance_km for obs in self.observatories])
-        weights = 1.0 / (distances ** power + 1e-6)  # Add epsilon to avoid division by zero
+        exact = distances == 0
+        if np.any(exact):
+            # Target coincides with an observatory: use its value directly
+            weights = exact.astype(np.float64)
+        else:
+            # Avoid the generic pow() for the common integer powers
+            if power == 2:
+                weighted_distances = distances * distances
+            elif power == 1:
+                weighted_distances = distances
+            else:
+                weighted_distances = distances ** power
+            weights = 1.0 / (weighted_distances + 1e-6)  # Add epsilon to avoid division by zero
         weights = weights / np.sum(weights)  # Normalize
 
         # Interpolate each component
@@ -176,6 +195,7 @@ class SpatialInterpolator:
         """Simple GP interpolation using current data only."""
         # Extract coordinates and magnetic values
         X_obs = []
+        codes = []
         y_x = []
         y_y = []
         y_z = []
@@ -183,6 +203,7 @@ class SpatialInterpolator:
         for i, obs in enumerate(self.observatories):
             if obs.code in magnetic_data:
                 X_obs.append([obs.latitude, obs.longitude, obs.elevation])
+                codes.append(obs.code)
                 data = magnetic_data[obs.code]
                 if len(data) >= 3:
                     y_x.append(data[0])
@@ -200,9 +221,6 @@ class SpatialInterpolator:
         X_obs = np.array(X_obs)
         target_point = np.array([[self.network.target_lat, self.network.target_lon, 0.0]])
 
-        # Define GP kernel
-        kernel = ConstantKernel(1.0) * RBF(length_scale=100.0) + WhiteKernel(noise_level=0.1)
-
         results = {}
 
         # Fit GP for each component
@@ -214,8 +232,7 @@ class SpatialInterpolator:
                 pred_std = 0.1
             else:
                 try:
-                    gp = GaussianProcessRegressor(kernel=kernel, random_state=42)
-                    gp.fit(X_obs, y_values)
+                    gp = self._fitted_gp(X_obs, codes, component, y_values)
 
                     pred_mean, pred_std = gp.predict(target_point, return_std=True)
                     pred_mean = pred_mean[0]
@@ -248,6 +265,36 @@ class SpatialInterpolator:
             timestamp=datetime.now()
         )
 
+    def _fitted_gp(self, X_obs: np.ndarray, codes: List[str], component: str,
+                   y_values: np.ndarray) -> 'GaussianProcessRegressor':
+        """
+        GaussianProcessRegressor for one component, fitted once per set of observatories.
+
+        The hyperparameter search runs on the first call for a given set of
+        reporting observatories. Later calls reuse the fitted kernel_ and its
+        Cholesky factor L_, so new observations only cost the alpha_ = K^-1 y
+        solve instead of a full fit.
+
+        Args:
+            X_obs: (n, 3) observatory coordinates in the order of codes
+            codes: Codes of the reporting observatories
+            component: Field component ('x', 'y' or 'z')
+            y_values: Observed values of the component
+
+        Returns:
+            Fitted regressor conditioned on y_values
+        """
+        key = (tuple(codes), component)
+        gp = self.gp_models.get(key)
+        if gp is None:
+            gp = GaussianProcessRegressor(kernel=_gp_kernel(), random_state=42)
+            gp.fit(X_obs, y_values)
+            self.gp_models[key] = gp
+        elif not np.array_equal(gp.y_train_, y_values):
+            gp.y_train_ = y_values
+            gp.alpha_ = cho_solve((gp.L_, True), y_values)
+        return gp
+
     def ensemble_interpolation(self, magnetic_data: Dict[str, np.ndarray],
                              methods: List[str] = None) -> InterpolationResult:
         """
@@ -281,6 +328,11 @@ class SpatialInterpolator:
             print("No valid interpolation methods available")
             return self.inverse_distance_weighting(magnetic_data)
 
+        return self._combine_results(results, weights, methods)
+
+    def _combine_results(self, results: List[InterpolationResult], weights: List[float],
+                         methods: List[str]) -> InterpolationResult:
+        """Weighted ensemble average of already computed interpolation results."""
         # Normalize weights
         weights = np.array(weights)
         weights = weights / np.sum(weights)
@@ -311,6 +363,45 @@ class SpatialInterpolator:
             timestamp=datetime.now()
         )
 
+    def run_all(self, magnetic_data: Dict[str, np.ndarray],
+                ensemble_weights: Optional[Dict[str, float]] = None,
+                parallel: bool = False) -> Dict[str, InterpolationResult]:
+        """
+        Run IDW, GP and Ensemble interpolation, computing IDW and GP only once.
+
+        Args:
+            magnetic_data: Current magnetic data from observatories
+            ensemble_weights: Ensemble weights keyed 'idw'/'gp' (default 0.3/0.7)
+            parallel: Run IDW and GP concurrently in worker threads
+
+        Returns:
+            Dict with 'IDW', 'GP' and 'Ensemble' InterpolationResults
+        """
+        if ensemble_weights is None:
+            ensemble_weights = {'idw': 0.3, 'gp': 0.7}
+
+        if parallel:
+            # NumPy/LAPACK release the GIL, so the two methods can overlap
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                idw_future = executor.submit(self.inverse_distance_weighting, magnetic_data)
+                gp_future = executor.submit(self.gaussian_process_interpolation, magnetic_data)
+                idw_result = idw_future.result()
+                gp_result = gp_future.result()
+        else:
+            idw_result = self.inverse_distance_weighting(magnetic_data)
+            gp_result = self.gaussian_process_interpolation(magnetic_data)
+
+        # The ensemble only depends on the two results above
+        if ML_AVAILABLE:
+            ensemble_result = self._combine_results(
+                [idw_result, gp_result],
+                [ensemble_weights['idw'], ensemble_weights['gp']],
+                ['idw', 'gp'])
+        else:
+            ensemble_result = self._combine_results([idw_result], [ensemble_weights['idw']], ['idw', 'gp'])
+
+        return {'IDW': idw_result, 'GP': gp_result, 'Ensemble': ensemble_result}
+
     def interpolate_magnetic_field(self, magnetic_data: Dict[str, np.ndarray],
                                  method: str = "ensemble") -> InterpolationResult:
         """
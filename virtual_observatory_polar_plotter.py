@@ -400,7 +400,7 @@ class VirtualObservatoryPolarPlotter:
 
         # Geomagnetic context
         print(f"\n🧭 Geomagnetic Context for Palmer, Alaska:")
-        print(f"   Expected declination: ~-17.5° (from config)")
+        print(f"   Expected declination: ~14.3° E (from config)")
         print(f"   Expected inclination: ~75-80° (high latitude)")
         print(f"   Measured inclination: {local_data['inclination_deg'].mean():.1f}°")
 
@@ -2,6 +2,7 @@
 GTK GUI for real-time weather station data display.
 Note: Requires PyGObject to be installed with system dependencies.
 """
+import logging
 import threading
 import time
 from datetime import datetime, timedelta
@@ -277,4 +278,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file